@@ -0,0 +1,41 @@
+"""
+Exécution concurrente des lots d'appels (JSON-RPC batch, /api/odoo/batch)
+"""
+
+import os
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, List, Optional
+
+from .odoo_client import OdooClient
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "100"))
+BATCH_TENANT_CONCURRENCY = int(os.getenv("BATCH_TENANT_CONCURRENCY", "8"))
+
+# Un sémaphore par tenant : le pool de sessions garantit un client par tenant,
+# et l'entrée disparaît avec le client quand il est évincé.
+_tenant_semaphores: "weakref.WeakKeyDictionary[OdooClient, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def tenant_semaphore(odoo_client: OdooClient) -> asyncio.Semaphore:
+    """Sémaphore limitant les appels concurrents d'un tenant"""
+    semaphore = _tenant_semaphores.get(odoo_client)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(BATCH_TENANT_CONCURRENCY)
+        _tenant_semaphores[odoo_client] = semaphore
+    return semaphore
+
+async def run_batch(odoo_client: Optional[OdooClient], calls: List[Callable[[], Awaitable[Any]]]) -> List[Any]:
+    """Exécuter les appels en parallèle, résultats dans l'ordre de la requête
+    
+    Chaque appel doit gérer ses propres erreurs : une exception interrompt le lot.
+    """
+    if odoo_client is not None:
+        semaphore = tenant_semaphore(odoo_client)
+    else:
+        semaphore = asyncio.Semaphore(BATCH_TENANT_CONCURRENCY)
+    
+    async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await call()
+    
+    return await asyncio.gather(*(run(call) for call in calls))
@@ -0,0 +1,163 @@
+"""
+Suivi de santé et disjoncteur par instance Odoo
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_CONSECUTIVE_FAILURES = int(os.getenv("BREAKER_CONSECUTIVE_FAILURES", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """L'instance Odoo est considérée indisponible : appel refusé sans réseau"""
+
+class EndpointHealth:
+    """Taux d'erreur et latence glissants d'une instance, avec disjoncteur
+    
+    - closed : les appels passent ; le disjoncteur s'ouvre si le taux d'erreur
+      de la fenêtre dépasse le seuil, ou après N échecs consécutifs ;
+    - open : les appels échouent immédiatement pendant ``open_seconds`` ;
+    - half_open : un seul appel de test passe, son résultat referme ou rouvre.
+    
+    Seules les pannes de transport (timeout, connexion, HTTP 5xx, réponse
+    illisible) comptent comme des échecs, pas les erreurs métier Odoo.
+    """
+    
+    def __init__(
+        self,
+        window: float = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        consecutive_failures: int = BREAKER_CONSECUTIVE_FAILURES,
+        open_seconds: float = BREAKER_OPEN_SECONDS
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.consecutive_failures_threshold = consecutive_failures
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_used = time.monotonic()
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._outcomes: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+    
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+    
+    def before_call(self):
+        """Autoriser l'appel, ou lever CircuitOpenError"""
+        now = time.monotonic()
+        with self._lock:
+            self.last_used = now
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    raise CircuitOpenError("Instance Odoo indisponible (disjoncteur ouvert)")
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError("Instance Odoo indisponible (test de reprise en cours)")
+                self._probe_in_flight = True
+    
+    def rejecting(self) -> bool:
+        """Vrai si le disjoncteur est ouvert et qu'aucun test n'est encore dû"""
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds
+    
+    def cancel(self):
+        """Appel interrompu sans verdict (annulation) : libérer le test de reprise"""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        with self._lock:
+            self._outcomes.append((now, ok, latency))
+            self._trim(now)
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self.state = CLOSED
+                    self._consecutive_failures = 0
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            
+            if ok:
+                self._consecutive_failures = 0
+                return
+            self._consecutive_failures += 1
+            if self.state == CLOSED and (
+                self._consecutive_failures >= self.consecutive_failures_threshold
+                or (len(self._outcomes) >= self.min_calls and self._error_rate() >= self.error_rate_threshold)
+            ):
+                self._open(now)
+    
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+    
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok, _ in self._outcomes if not ok) / len(self._outcomes)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            latencies = sorted(latency for _, _, latency in self._outcomes)
+            return {
+                "state": self.state,
+                "calls": len(latencies),
+                "error_rate": round(self._error_rate(), 3),
+                "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                "latency_max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+            }
+
+class EndpointRegistry:
+    """Santé de chaque instance Odoo, indexée par hôte"""
+    
+    # Entrées oubliées après une heure sans appel
+    IDLE_SECONDS = 3600
+    
+    def __init__(self):
+        self._endpoints: Dict[str, EndpointHealth] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, host: str) -> EndpointHealth:
+        endpoint = self._endpoints.get(host)
+        if endpoint is None:
+            with self._lock:
+                endpoint = self._endpoints.setdefault(host, EndpointHealth())
+        return endpoint
+    
+    def summary(self) -> Dict[str, Any]:
+        """Vue pour /health : compte par état et détail des instances dégradées"""
+        now = time.monotonic()
+        with self._lock:
+            for host in [h for h, e in self._endpoints.items() if e.state == CLOSED and now - e.last_used > self.IDLE_SECONDS]:
+                del self._endpoints[host]
+            endpoints = dict(self._endpoints)
+        states = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        degraded = {}
+        for host, endpoint in endpoints.items():
+            snapshot = endpoint.snapshot()
+            states[snapshot["state"]] += 1
+            if snapshot["state"] != CLOSED:
+                degraded[host] = snapshot
+        return {"states": states, "degraded": degraded}
+
+endpoint_registry = EndpointRegistry()
@@ -0,0 +1,154 @@
+"""
+Compression négociée des réponses (gzip, br, zstd), compatible avec les flux
+"""
+
+import os
+import json
+import zlib
+from typing import AsyncIterator, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Politique par préfixe de route (le plus long l'emporte) :
+#   on       : réponses complètes et flux (un bloc compressé vidé par morceau)
+#   buffered : réponses complètes seulement, flux non compressés
+#   off      : jamais
+# Surchargeable via COMPRESSION_ROUTES (JSON), ex. {"/api/odoo/stream": "buffered"}
+# Fichiers statiques non compressés : nginx les sert (gzip_static), et leurs
+# réponses partielles (Range) et ETag fort ne survivent pas à la compression
+DEFAULT_ROUTE_POLICY = {"/": "on", "/static/": "off"}
+COMPRESSION_ROUTES = {**DEFAULT_ROUTE_POLICY, **json.loads(os.getenv("COMPRESSION_ROUTES", "{}"))}
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json", "application/x-ndjson", "text/event-stream",
+    "text/", "application/javascript", "application/xml", "image/svg+xml"
+)
+
+# Préférence serveur à qualité égale : zstd, puis br, puis gzip
+SUPPORTED_ENCODINGS = tuple(
+    encoding for encoding, available in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if available
+)
+
+def route_policy(path: str) -> str:
+    prefixes = [prefix for prefix in COMPRESSION_ROUTES if path.startswith(prefix)]
+    if not prefixes:
+        return "off"
+    return COMPRESSION_ROUTES[max(prefixes, key=len)]
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Encodage retenu d'après Accept-Encoding (valeurs q comprises), ou None"""
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            qualities[name.strip()] = quality
+    
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(COMPRESSIBLE_MEDIA_TYPES)
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + self._compressor.flush() if flush else out
+    
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+_ENCODERS = {"gzip": _GzipEncoder, "br": _BrotliEncoder, "zstd": _ZstdEncoder}
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compresser une réponse complète"""
+    encoder = _ENCODERS[encoding]()
+    return encoder.compress(body, False) + encoder.finish()
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+    """Compresser un flux en vidant le compresseur après chaque morceau
+    
+    Chaque ligne NDJSON ou événement SSE reste décodable dès sa réception,
+    au prix d'un taux de compression un peu moindre.
+    """
+    encoder = _ENCODERS[encoding]()
+    async for chunk in chunks:
+        out = encoder.compress(chunk, True)
+        if out:
+            yield out
+    yield encoder.finish()
+
+def skip_compression(method: str, status_code: int, headers) -> bool:
+    """Réponse à laisser telle quelle : sans corps, partielle (Range) ou déjà encodée
+    
+    Compresser une réponse 206 rendrait son Content-Range faux.
+    """
+    return (
+        method == "HEAD"
+        or status_code in (204, 206, 304)
+        or "content-range" in headers
+        or "content-encoding" in headers
+    )
+
+def weak_etag(etag: str) -> str:
+    """ETag faible : la version compressée n'est pas identique octet par octet"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+def select_encoding(path: str, accept_encoding: str, content_type: str, streaming: bool) -> Optional[str]:
+    """Encodage à appliquer à une réponse, ou None pour la laisser telle quelle"""
+    policy = route_policy(path)
+    if not COMPRESSION_ENABLED or policy == "off" or (streaming and policy != "on"):
+        return None
+    if not is_compressible(content_type):
+        return None
+    return negotiate_encoding(accept_encoding)
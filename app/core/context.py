@@ -0,0 +1,13 @@
+"""
+Contexte par requête (tenant courant)
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+from .odoo_client import OdooClient
+
+# Client Odoo du tenant de la requête en cours.
+# Chaque requête (et chaque tâche asyncio) a sa propre valeur, contrairement
+# à un attribut global : deux tenants concurrents ne peuvent pas se croiser.
+current_odoo_client: ContextVar[Optional[OdooClient]] = ContextVar("current_odoo_client", default=None)
@@ -2,26 +2,121 @@
 Configuration de la base de données
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
+from typing import AsyncIterator, Optional
 import os
 from dotenv import load_dotenv
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:  # SQLAlchemy < 1.4
+    create_async_engine = None
+
 load_dotenv()
 
 # Configuration de la base de données
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./odoo_mcp_proxy.db")
+# URL du moteur asynchrone ; déduite de DATABASE_URL (aiosqlite, asyncpg) si vide
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# Pool de connexions (ignoré pour SQLite en mémoire)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite : WAL (lectures concurrentes pendant une écriture) et attente du verrou
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-16000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", "134217728"))
+
+# Pilotes asynchrones par défaut
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000}
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """URL asynchrone correspondant à ``url`` (même base, pilote asynchrone)"""
+    if ASYNC_DATABASE_URL:
+        return ASYNC_DATABASE_URL
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
 
 # Créer l'engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
 # Créer la session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur asynchrone, créé au premier usage (le pilote n'est importé qu'à ce moment)
+_async_engine: Optional["AsyncEngine"] = None
+_async_session_factory = None
+
+def get_async_engine() -> "AsyncEngine":
+    global _async_engine
+    if _async_engine is None:
+        if create_async_engine is None:
+            raise RuntimeError("SQLAlchemy asyncio indisponible (SQLAlchemy >= 1.4 requis)")
+        url = async_database_url()
+        _async_engine = create_async_engine(url, **_engine_options(url))
+        if _is_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return _async_engine
+
+def AsyncSessionLocal() -> "AsyncSession":
+    """Nouvelle session asynchrone (à utiliser avec ``async with``)"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_session_factory()
+
+async def dispose_async_engine():
+    """Fermer les connexions du moteur asynchrone (arrêt du serveur)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 # Base pour les modèles
 Base = declarative_base()
 
@@ -33,11 +128,36 @@ def get_db():
     finally:
         db.close()
 
-def create_tables():
-    """Créer toutes les tables"""
-    from .models import Base
-    Base.metadata.create_all(bind=engine)
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """Dependency pour obtenir une session asynchrone"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _alembic_config():
+    from alembic.config import Config
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    config = Config(os.path.join(root, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(root, "migrations"))
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    # Garder la journalisation de l'application (pas de fileConfig depuis alembic.ini)
+    config.attributes["configure_logger"] = False
+    return config
+
+def _baseline_revision(tables: set) -> Optional[str]:
+    """Révision correspondant au schéma d'une base créée avant les migrations (create_all)"""
+    if "users" not in tables or "alembic_version" in tables:
+        return None
+    return "0002" if "api_token_usage" in tables else "0001"
 
 def init_db():
-    """Initialiser la base de données"""
-    create_tables()
+    """Créer ou mettre à jour les tables (migrations Alembic jusqu'à la dernière version)
+    
+    Une base créée avant les migrations (tables présentes, sans ``alembic_version``)
+    est d'abord marquée à la révision qui correspond à ses tables.
+    """
+    from alembic import command
+    config = _alembic_config()
+    baseline = _baseline_revision(set(inspect(engine).get_table_names()))
+    if baseline is not None:
+        command.stamp(config, baseline)
+    command.upgrade(config, "head")
@@ -0,0 +1,122 @@
+"""
+Cycle de vie d'un worker : préchauffage, vidange à l'arrêt, sécurité après fork
+
+Chaque worker (processus) a son propre état : client HTTP, pool de sessions
+Odoo, caches (tokens, résultats, schémas), disjoncteurs et métriques. Seuls la
+base de données, l'usage (écrit par incréments) et les limites de débit en
+backend SQLite sont partagés entre workers.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import List
+from sqlalchemy import func, text
+from loguru import logger
+
+from . import database, odoo_client
+from .models import User, APIToken
+from .rate_limit import rate_limiter, SQLiteRateLimitBackend
+from .scheduler import call_scheduler
+from .session_pool import session_pool
+from .usage import usage_aggregator
+
+# Nombre de workers (processus) du serveur ; 1 = un seul processus
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+# Boucle d'événements (auto, uvloop, asyncio) et parseur HTTP (auto, httptools, h11)
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")
+# Délai laissé aux requêtes en cours après SIGTERM, puis aux appels Odoo restants
+SERVER_GRACEFUL_TIMEOUT = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_KEEPALIVE_TIMEOUT = int(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "5"))
+# Hôtes Odoo (les plus récemment utilisés) vers lesquels ouvrir une connexion au démarrage
+SERVER_WARM_ODOO_HOSTS = int(os.getenv("SERVER_WARM_ODOO_HOSTS", "20"))
+SERVER_WARM_TIMEOUT = float(os.getenv("SERVER_WARM_TIMEOUT", "5"))
+
+def _recent_odoo_urls(limit: int) -> List[str]:
+    db = database.SessionLocal()
+    try:
+        last_used = func.max(APIToken.last_used)
+        rows = (
+            db.query(User.odoo_url, last_used)
+            .join(APIToken, APIToken.user_id == User.user_id)
+            .filter(User.is_active == True, APIToken.is_active == True)
+            .group_by(User.odoo_url)
+            .order_by(last_used.desc())
+            .limit(limit)
+            .all()
+        )
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+def _warm_database():
+    with database.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+async def _warm_odoo_host(url: str):
+    # common.version ne demande pas d'authentification : seule la connexion (TCP + TLS) compte
+    client = odoo_client.OdooClient(url, "", "", "")
+    payload = {"jsonrpc": "2.0", "method": "call", "params": {"service": "common", "method": "version", "args": []}}
+    await odoo_client.get_http_client().post(client.auth_url, json=payload, timeout=SERVER_WARM_TIMEOUT)
+
+async def warm_up():
+    """Ouvrir le moteur de base de données et les connexions vers les hôtes Odoo actifs
+    
+    Les échecs sont journalisés sans bloquer le démarrage.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_warm_database)
+        urls = await asyncio.to_thread(_recent_odoo_urls, SERVER_WARM_ODOO_HOSTS) if SERVER_WARM_ODOO_HOSTS > 0 else []
+    except Exception as e:
+        logger.warning(f"Préchauffage de la base de données impossible: {e}")
+        return
+    
+    odoo_client.get_http_client()
+    results = await asyncio.gather(*(_warm_odoo_host(url) for url in urls), return_exceptions=True)
+    failed = sum(1 for result in results if isinstance(result, BaseException))
+    logger.info(
+        "Préchauffage terminé en {duration:.0f} ms ({warmed}/{hosts} hôtes Odoo)",
+        duration=(time.perf_counter() - started) * 1000, warmed=len(urls) - failed, hosts=len(urls)
+    )
+
+async def drain_odoo_calls(timeout: float = SERVER_GRACEFUL_TIMEOUT) -> bool:
+    """Attendre la fin des appels Odoo en cours ou en file (appels partagés compris)
+    
+    Retourne False si des appels sont encore en cours à l'expiration du délai.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        stats = call_scheduler.stats()
+        pending = stats["inflight"] + stats["queued"]
+        if not pending:
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning(f"Arrêt avec {pending} appel(s) Odoo encore en cours")
+            return False
+        await asyncio.sleep(0.05)
+
+def _reset_after_fork():
+    """Réinitialiser dans le processus enfant l'état hérité du parent
+    
+    Utile quand l'application est importée avant le fork (gunicorn --preload) ;
+    les workers uvicorn sont lancés par spawn et importent tout à nouveau.
+    """
+    # Connexions (base, HTTP, SQLite) et verrous : propres au processus parent
+    database.engine.dispose(close=False)
+    database._async_engine = None
+    database._async_session_factory = None
+    odoo_client._http_client = None
+    session_pool._lock = threading.Lock()
+    session_pool.clear()
+    if isinstance(rate_limiter.backend, SQLiteRateLimitBackend):
+        rate_limiter.backend._local = threading.local()
+    # L'usage en attente sera écrit par le parent ; ne pas le compter deux fois
+    usage_aggregator._lock = threading.Lock()
+    usage_aggregator._pending = {}
+    usage_aggregator._task = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
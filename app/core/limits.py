@@ -0,0 +1,47 @@
+"""
+Limites de résultats par défaut et maximales, par tenant et par modèle
+"""
+
+import os
+import json
+from typing import Optional, Tuple
+
+ODOO_DEFAULT_LIMIT = int(os.getenv("ODOO_DEFAULT_LIMIT", "10"))
+ODOO_MAX_LIMIT = int(os.getenv("ODOO_MAX_LIMIT", "1000"))
+
+# Surcharges (JSON), par modèle et par instance Odoo (hôte), la plus précise l'emporte :
+# {"models": {"account.move.line": {"max": 200}},
+#  "tenants": {"acme.odoo.com": {"default": 20, "max": 500, "models": {"crm.lead": {"max": 100}}}}}
+ODOO_LIMIT_POLICY = json.loads(os.getenv("ODOO_LIMIT_POLICY", "{}"))
+
+class LimitPolicy:
+    """Résolution des limites (défaut, maximum) d'une recherche"""
+    
+    def __init__(self, default: int = ODOO_DEFAULT_LIMIT, maximum: int = ODOO_MAX_LIMIT, overrides: dict = None):
+        self.default = default
+        self.maximum = maximum
+        self.overrides = overrides if overrides is not None else ODOO_LIMIT_POLICY
+    
+    def limits_for(self, host: Optional[str], model: str) -> Tuple[int, int]:
+        """(limite par défaut, limite maximale) pour un modèle d'une instance"""
+        tenant = self.overrides.get("tenants", {}).get(host or "", {})
+        layers = (
+            {"default": self.default, "max": self.maximum},
+            self.overrides.get("models", {}).get(model, {}),
+            tenant,
+            tenant.get("models", {}).get(model, {}),
+        )
+        default, maximum = self.default, self.maximum
+        for layer in layers:
+            default = layer.get("default", default)
+            maximum = layer.get("max", maximum)
+        return min(default, maximum), maximum
+    
+    def resolve(self, host: Optional[str], model: str, requested: Optional[int]) -> int:
+        """Limite effective : défaut si absente ou 0, ramenée au maximum sinon"""
+        default, maximum = self.limits_for(host, model)
+        if not requested:
+            return default
+        return min(requested, maximum)
+
+limit_policy = LimitPolicy()
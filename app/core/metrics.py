@@ -0,0 +1,163 @@
+"""
+Métriques au format d'exposition Prometheus (compteurs et histogrammes)
+"""
+
+import os
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Jeton exigé sur /metrics (Authorization: Bearer ...) ; sans jeton, /metrics
+# ne répond qu'aux requêtes locales directes (sans X-Forwarded-For)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Nombre maximal de séries par métrique ; au-delà, les nouvelles combinaisons
+# de labels sont regroupées sous la valeur "other"
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", "2000"))
+# Label tenant (hôte Odoo) sur les métriques d'appels ; false pour le supprimer
+METRICS_TENANT_LABEL = os.getenv("METRICS_TENANT_LABEL", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+OVERFLOW_LABEL = "other"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        key = tuple(str(value) for value in labels)
+        if key not in self._series and len(self._series) >= METRICS_MAX_SERIES:
+            return (OVERFLOW_LABEL,) * len(self.labelnames)
+        return key
+    
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            series = list(self._series.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}" for key, value in series
+        ]
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # [compteurs par bucket (non cumulés) + +Inf, somme]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        lines = self.header()
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées sur /metrics
+    
+    Les collecteurs enregistrés sont appelés à chaque lecture et renvoient des
+    jauges ``(nom, aide, valeur)`` calculées à partir des statistiques existantes.
+    Ils sont indexés par nom de fonction : un module importé deux fois (script
+    principal d'un worker lancé par spawn) ne duplique pas ses jauges.
+    """
+    
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, str, float]]]] = {}
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, float]]]):
+        self._collectors[collector.__qualname__] = collector
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors.values():
+            for name, documentation, value in collector():
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {_format_number(value)}"])
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+def tenant_label(host: str) -> str:
+    return host if METRICS_TENANT_LABEL else ""
+
+# Requêtes HTTP par point d'entrée (/mcp, /api/odoo/...)
+http_requests = registry.counter("odoo_mcp_http_requests_total", "HTTP requests by entry point and status", ("entry", "status"))
+http_duration = registry.histogram("odoo_mcp_http_request_duration_seconds", "HTTP request latency by entry point", ("entry",))
+http_request_size = registry.histogram("odoo_mcp_http_request_size_bytes", "HTTP request body size by entry point", ("entry",), SIZE_BUCKETS)
+http_response_size = registry.histogram("odoo_mcp_http_response_size_bytes", "HTTP response body size by entry point", ("entry",), SIZE_BUCKETS)
+
+# Messages JSON-RPC MCP par méthode (initialize, tools/list, tools/call...)
+mcp_messages = registry.counter("odoo_mcp_jsonrpc_messages_total", "MCP JSON-RPC messages by method", ("method",))
+
+# Appels de l'outil universel / API REST, de bout en bout (proxy + Odoo)
+calls = registry.counter("odoo_mcp_calls_total", "Odoo calls by entry point, tenant, model, method and outcome", ("entry", "tenant", "model", "method", "outcome"))
+call_duration = registry.histogram("odoo_mcp_call_duration_seconds", "End-to-end call latency by entry point, tenant, model and method", ("entry", "tenant", "model", "method"))
+
+# Temps passé chez Odoo (RPC, réauthentification et nouvelles tentatives comprises)
+upstream_duration = registry.histogram("odoo_mcp_upstream_rpc_duration_seconds", "Odoo RPC latency by tenant, model and method", ("tenant", "model", "method"))
+upstream_errors = registry.counter("odoo_mcp_upstream_rpc_errors_total", "Odoo RPC errors by tenant, model and method", ("tenant", "model", "method"))
+
+# Résolution token -> tenant (cache mémoire ou base)
+token_lookup_duration = registry.histogram("odoo_mcp_token_lookup_duration_seconds", "Token resolution latency by source", ("source",))
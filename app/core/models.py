@@ -2,7 +2,7 @@
 Modèles de données pour le proxy MCP multi-tenant
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -40,6 +40,10 @@ class APIToken(Base):
     """Modèle pour gérer les tokens API"""
     
     __tablename__ = "api_tokens"
+    # Index des recherches fréquentes (migration 0003)
+    __table_args__ = (
+        Index("ix_api_tokens_user_last_used", "user_id", "last_used"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String(64), unique=True, index=True, nullable=False)
@@ -56,3 +60,27 @@ class APIToken(Base):
     
     def __repr__(self):
         return f"<APIToken(token='{self.token[:8]}...', user_id='{self.user_id}')>"
+
+class APITokenUsage(Base):
+    """Consommation agrégée par token API et par heure"""
+    
+    __tablename__ = "api_token_usage"
+    __table_args__ = (
+        UniqueConstraint("api_token_id", "period_start"),
+        Index("ix_api_token_usage_user_period", "user_id", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    api_token_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(String(36), nullable=False, index=True)
+    period_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    # Compteurs de la période
+    requests = Column(Integer, default=0)
+    odoo_calls = Column(Integer, default=0)
+    bytes_out = Column(BigInteger, default=0)
+    total_latency_ms = Column(Float, default=0)
+    max_latency_ms = Column(Float, default=0)
+    
+    def __repr__(self):
+        return f"<APITokenUsage(api_token_id={self.api_token_id}, period_start='{self.period_start}')>"
@@ -3,29 +3,169 @@ Client Odoo pour les appels JSON-RPC
 Basé sur votre code existant qui fonctionne bien
 """
 
-import requests
-import json
-from typing import Dict, Any, Optional
+import os
+import time
+import asyncio
+import hashlib
+import httpx
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlparse
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from loguru import logger
 
+from .result_cache import result_cache, make_cache_key, READ_ONLY_METHODS
+from .scheduler import call_scheduler, SchedulerOverflow
+from .usage import count_odoo_call
+from .circuit_breaker import endpoint_registry, CircuitOpenError
+from .retry import retry_policy
+from .single_flight import odoo_single_flight
+from . import metrics, tracing
+
+# Configuration du transport HTTP partagé
+ODOO_HTTP_MAX_CONNECTIONS = int(os.getenv("ODOO_HTTP_MAX_CONNECTIONS", "200"))
+ODOO_HTTP_MAX_KEEPALIVE = int(os.getenv("ODOO_HTTP_MAX_KEEPALIVE", "50"))
+ODOO_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("ODOO_HTTP_KEEPALIVE_EXPIRY", "60"))
+ODOO_HTTP_CONNECT_TIMEOUT = float(os.getenv("ODOO_HTTP_CONNECT_TIMEOUT", "10"))
+ODOO_HTTP_READ_TIMEOUT = float(os.getenv("ODOO_HTTP_READ_TIMEOUT", "60"))
+ODOO_HTTP_POOL_TIMEOUT = float(os.getenv("ODOO_HTTP_POOL_TIMEOUT", "10"))
+
+# Lectures par lots (read_many)
+ODOO_READ_CHUNK_SIZE = int(os.getenv("ODOO_READ_CHUNK_SIZE", "500"))
+ODOO_READ_CONCURRENCY = int(os.getenv("ODOO_READ_CONCURRENCY", "4"))
+
+# Lectures paginées en streaming (iter_search_read)
+ODOO_STREAM_PAGE_SIZE = int(os.getenv("ODOO_STREAM_PAGE_SIZE", "500"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client HTTP partagé par tous les tenants.
+    
+    httpx conserve un pool de connexions keep-alive par hôte Odoo et réutilise
+    le même contexte SSL, donc les sessions TLS, pour toutes les requêtes.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            # Aucun cookie conservé : le client est partagé entre tenants,
+            # les sessions Odoo sont transmises explicitement par requête.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(
+                max_connections=ODOO_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=ODOO_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=ODOO_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=ODOO_HTTP_CONNECT_TIMEOUT,
+                read=ODOO_HTTP_READ_TIMEOUT,
+                write=ODOO_HTTP_READ_TIMEOUT,
+                pool=ODOO_HTTP_POOL_TIMEOUT,
+            ),
+        )
+    return _http_client
+
+async def close_http_client():
+    """Fermer le client HTTP partagé (arrêt du serveur)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Mode d'authentification : "password" (execute_kw avec mot de passe)
+# ou "session" (cookie /web/session/authenticate)
+ODOO_AUTH_MODE = os.getenv("ODOO_AUTH_MODE", "password")
+
+# UID par (url, db, login), partagés entre clients : le mot de passe est
+# renvoyé à chaque appel, un UID en cache ne donne donc aucun accès.
+_uid_cache: Dict[Tuple[str, str, str], int] = {}
+
+# Sessions web par (url, db, login, empreinte du mot de passe) : le cookie
+# suffit à s'authentifier, il ne doit être réutilisé qu'avec le même secret.
+_session_cache: Dict[Tuple[str, str, str, str], Tuple[int, str]] = {}
+
+def _is_auth_error(error: Any) -> bool:
+    """L'erreur Odoo indique-t-elle des identifiants ou une session invalides ?"""
+    if not isinstance(error, dict):
+        return False
+    data = error.get("data") or {}
+    text = f"{data.get('name', '')} {data.get('message', '')} {error.get('message', '')}"
+    return any(marker in text for marker in ("AccessDenied", "Access Denied", "SessionExpired", "Session expired"))
+
 class OdooClient:
-    """Client Odoo utilisant JSON-RPC (compatible Odoo 19+)"""
+    """Client Odoo asynchrone utilisant JSON-RPC (compatible Odoo 19+)"""
     
-    def __init__(self, odoo_url: str, odoo_db: str, odoo_username: str, odoo_password: str):
+    def __init__(self, odoo_url: str, odoo_db: str, odoo_username: str, odoo_password: str, auth_mode: str = None):
         self.odoo_url = odoo_url.strip()
         self.odoo_db = odoo_db
         self.odoo_username = odoo_username
         self.odoo_password = odoo_password
+        self.auth_mode = auth_mode or ODOO_AUTH_MODE
         
         # Normalisation de l'URL Odoo
         if not self.odoo_url.startswith("http://") and not self.odoo_url.startswith("https://"):
             self.odoo_url = f"https://{self.odoo_url}"
         
         self.auth_url = f"{self.odoo_url}/jsonrpc"
+        self.host = urlparse(self.odoo_url).netloc
         self.uid = None
+        self.session_id = None
+        self._auth_lock = asyncio.Lock()
+        
+        # Identité Odoo du tenant (clé des caches partagés). L'empreinte du mot
+        # de passe évite qu'un client aux identifiants erronés lise le cache d'un autre.
+        password_hash = hashlib.sha256(self.odoo_password.encode("utf-8")).hexdigest()[:16]
+        self._uid_key = (self.odoo_url, self.odoo_db, self.odoo_username)
+        self._session_key = (self.odoo_url, self.odoo_db, self.odoo_username, password_hash)
+        self.tenant_key = f"{self.odoo_url}|{self.odoo_db}|{self.odoo_username}|{password_hash}"
     
-    def authenticate(self) -> bool:
+    async def _send(self, url: str, payload: Dict[str, Any], headers: Dict[str, str] = None) -> Tuple[httpx.Response, Any]:
+        """Envoyer une requête via le client HTTP partagé
+        
+        Retourne la réponse et son corps JSON décodé (None hors statut 2xx).
+        Chaque appel alimente la santé de l'instance : timeout, erreur de
+        connexion, statut 5xx ou corps 2xx illisible comptent comme des échecs.
+        CircuitOpenError est levée sans appel réseau tant que son disjoncteur
+        est ouvert.
+        """
+        health = endpoint_registry.get(self.host)
+        health.before_call()
+        count_odoo_call()
+        started = time.monotonic()
+        try:
+            with tracing.span("odoo.rpc", host=self.host, path=urlparse(url).path):
+                # Connexion, TLS, TTFB et corps en sous-spans quand la requête est tracée
+                hook = tracing.http_trace_hook()
+                extensions = {"trace": hook} if hook else None
+                response = await get_http_client().post(url, json=payload, headers=headers, extensions=extensions)
+        except httpx.TransportError:
+            health.record(False, time.monotonic() - started)
+            raise
+        except BaseException:
+            health.cancel()
+            raise
+        latency = time.monotonic() - started
+        data = None
+        if response.is_success:
+            try:
+                data = response.json()
+            except ValueError:
+                # Page d'erreur d'un proxy, corps tronqué : l'instance ne répond pas correctement
+                health.record(False, latency)
+                raise
+        health.record(response.status_code < 500, latency)
+        return response, data
+    
+    async def _post(self, payload: Dict[str, Any], url: str = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
+        """Envoyer un appel JSON-RPC et retourner la réponse décodée"""
+        response, data = await self._send(url or self.auth_url, payload, headers)
+        response.raise_for_status()
+        return data
+    
+    async def authenticate(self) -> bool:
         """Authentification auprès d'Odoo"""
+        if self.auth_mode == "session":
+            return await self._authenticate_session()
+        
         try:
             auth_payload = {
                 "jsonrpc": "2.0",
@@ -38,8 +178,7 @@ class OdooClient:
                 "id": 1
             }
             
-            response = requests.post(self.auth_url, json=auth_payload)
-            auth_data = response.json()
+            auth_data = await self._post(auth_payload)
             
             if "error" in auth_data or not auth_data.get("result"):
                 logger.error(f"Erreur d'authentification Odoo: {auth_data}")
@@ -50,117 +189,260 @@ class OdooClient:
                 logger.error("UID vide après authentification")
                 return False
             
-            logger.info(f"Authentification Odoo réussie pour {self.odoo_username}")
+            _uid_cache[self._uid_key] = self.uid
+            logger.bind(sampled=True).debug("Authentification Odoo réussie pour {username}", username=self.odoo_username)
             return True
-            
+        
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de l'authentification Odoo: {e}")
             return False
     
-    def execute_method(self, model: str, method: str, args: list = None, kwargs: dict = None) -> Dict[str, Any]:
-        """Exécuter une méthode Odoo"""
-        if not self.uid:
-            if not self.authenticate():
-                return {"error": "Authentification Odoo échouée"}
-        
+    async def _authenticate_session(self) -> bool:
+        """Ouvrir une session web Odoo (cookie session_id)"""
         try:
-            args = args or []
-            kwargs = kwargs or {}
-            
-            execute_payload = {
+            auth_payload = {
                 "jsonrpc": "2.0",
                 "method": "call",
                 "params": {
-                    "service": "object",
-                    "method": "execute_kw",
-                    "args": [
-                        self.odoo_db,
-                        self.uid,
-                        self.odoo_password,
-                        model,
-                        method,
-                        args,
-                        kwargs
-                    ]
+                    "db": self.odoo_db,
+                    "login": self.odoo_username,
+                    "password": self.odoo_password
                 },
-                "id": 2
+                "id": 1
             }
             
-            response = requests.post(self.auth_url, json=execute_payload)
-            execute_data = response.json()
+            response, auth_data = await self._send(f"{self.odoo_url}/web/session/authenticate", auth_payload)
+            response.raise_for_status()
+            session_id = response.cookies.get("session_id")
+            uid = (auth_data.get("result") or {}).get("uid")
+            
+            if "error" in auth_data or not uid or not session_id:
+                logger.error(f"Erreur d'authentification Odoo (session): {auth_data.get('error')}")
+                return False
+            
+            self.uid, self.session_id = uid, session_id
+            _uid_cache[self._uid_key] = uid
+            _session_cache[self._session_key] = (uid, session_id)
+            logger.bind(sampled=True).debug("Session Odoo ouverte pour {username}", username=self.odoo_username)
+            return True
+        
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de l'authentification Odoo (session): {e}")
+            return False
+    
+    def _load_cached_auth(self) -> bool:
+        """Reprendre l'UID (ou la session) d'un client précédent"""
+        if self.auth_mode == "session":
+            cached = _session_cache.get(self._session_key)
+            if cached:
+                self.uid, self.session_id = cached
+        else:
+            self.uid = _uid_cache.get(self._uid_key)
+        return bool(self.uid)
+    
+    def _forget_auth(self):
+        self.uid = None
+        self.session_id = None
+        _uid_cache.pop(self._uid_key, None)
+        _session_cache.pop(self._session_key, None)
+    
+    async def _ensure_authenticated(self) -> bool:
+        if self.uid or self._load_cached_auth():
+            return True
+        async with self._auth_lock:
+            if self.uid:
+                return True
+            return await self.authenticate()
+    
+    async def execute_method(self, model: str, method: str, args: list = None, kwargs: dict = None) -> Dict[str, Any]:
+        """Exécuter une méthode Odoo
+        
+        Les lectures sur les modèles couverts par la politique de TTL passent
+        par le cache de résultats du tenant ; toute autre méthode sur un modèle
+        invalide ses entrées, quel que soit son résultat. Les lectures identiques déjà en cours pour le même
+        tenant partagent un seul appel RPC.
+        """
+        ttl = result_cache.ttl_for(model, method)
+        if method in READ_ONLY_METHODS:
+            cache_key = make_cache_key(model, method, args, kwargs)
+            if ttl > 0:
+                cached = result_cache.get(self.tenant_key, cache_key)
+                if cached is not None:
+                    return cached
+            # Une écriture terminée change la génération : les lectures suivantes
+            # ne rejoignent pas un appel parti avant elle
+            generation = result_cache.generation(self.tenant_key, model)
+            return await odoo_single_flight.do(
+                (self.tenant_key, cache_key, generation),
+                lambda: self._fetch(model, method, args, kwargs, cache_key, ttl, generation)
+            )
+        
+        try:
+            return await self._fetch(model, method, args, kwargs)
+        finally:
+            # Même en erreur (timeout, réponse perdue), l'écriture a pu être validée par Odoo
+            result_cache.invalidate_model(self.tenant_key, model)
+    
+    async def _fetch(
+        self,
+        model: str,
+        method: str,
+        args: list,
+        kwargs: dict,
+        cache_key: str = None,
+        ttl: float = 0,
+        generation: int = None
+    ) -> Dict[str, Any]:
+        """Appel effectif : disjoncteur, ordonnanceur puis mise en cache"""
+        # Instance indisponible : échec immédiat, sans occuper de place dans l'ordonnanceur
+        if endpoint_registry.get(self.host).rejecting():
+            return {"error": "Instance Odoo indisponible (disjoncteur ouvert)"}
+        
+        # Limites de concurrence par tenant et par hôte (SchedulerOverflow si saturé)
+        try:
+            with tracing.span("odoo.call", model=model, method=method):
+                async with call_scheduler.slot(self.tenant_key, self.host):
+                    started = time.perf_counter()
+                    result = await self._execute_kw(model, method, args, kwargs)
+        except CircuitOpenError as e:
+            return {"error": str(e)}
+        
+        labels = (metrics.tenant_label(self.host), model, method)
+        metrics.upstream_duration.observe(time.perf_counter() - started, *labels)
+        if "error" in result:
+            metrics.upstream_errors.inc(*labels)
+        
+        if ttl > 0 and "error" not in result:
+            result_cache.set(self.tenant_key, model, cache_key, result, ttl, generation)
+        return result
+    
+    async def _execute_kw(self, model: str, method: str, args: list = None, kwargs: dict = None) -> Dict[str, Any]:
+        """Appel execute_kw brut (authentification à la demande)
+        
+        Sur une erreur d'authentification (mot de passe changé, session expirée,
+        UID en cache périmé), le client se réauthentifie une fois et rejoue l'appel.
+        Les erreurs transitoires suivent la politique de ``retry_policy``.
+        """
+        if not await self._ensure_authenticated():
+            return {"error": "Authentification Odoo échouée"}
+        
+        try:
+            args = args or []
+            kwargs = kwargs or {}
+            
+            # Erreurs transitoires rejouées pour les méthodes idempotentes
+            async def call():
+                return await retry_policy.call(method, lambda: self._call_kw(model, method, args, kwargs))
+            
+            execute_data = await call()
+            
+            if "error" in execute_data and _is_auth_error(execute_data["error"]):
+                logger.warning(f"Authentification Odoo expirée pour {self.odoo_username}, nouvelle tentative")
+                self._forget_auth()
+                if not await self._ensure_authenticated():
+                    return {"error": "Authentification Odoo échouée"}
+                execute_data = await call()
             
             if "error" in execute_data:
                 logger.error(f"Erreur Odoo: {execute_data['error']}")
                 return {"error": f"Erreur Odoo: {execute_data['error']}"}
             
             result = execute_data.get("result")
-            logger.info(f"Méthode Odoo exécutée: {model}.{method}")
+            logger.bind(sampled=True).debug("Méthode Odoo exécutée: {model}.{method}", model=model, method=method)
             return {"result": result}
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de l'exécution de la méthode Odoo: {e}")
             return {"error": str(e)}
     
-    def search_read(self, model: str, domain: list, fields: list, limit: int = None) -> list:
-        """Search and read records from Odoo
+    async def _call_kw(self, model: str, method: str, args: list, kwargs: dict) -> Dict[str, Any]:
+        """Un appel RPC, par execute_kw ou par la session web"""
+        if self.auth_mode == "session":
+            call_payload = {
+                "jsonrpc": "2.0",
+                "method": "call",
+                "params": {
+                    "model": model,
+                    "method": method,
+                    "args": args,
+                    "kwargs": kwargs
+                },
+                "id": 2
+            }
+            return await self._post(
+                call_payload,
+                url=f"{self.odoo_url}/web/dataset/call_kw/{model}/{method}",
+                headers={"Cookie": f"session_id={self.session_id}"}
+            )
+        
+        execute_payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "service": "object",
+                "method": "execute_kw",
+                "args": [
+                    self.odoo_db,
+                    self.uid,
+                    self.odoo_password,
+                    model,
+                    method,
+                    args,
+                    kwargs
+                ]
+            },
+            "id": 2
+        }
+        return await self._post(execute_payload)
+    
+    async def search_read(self, model: str, domain: list, fields: list, limit: int = None) -> list:
+        """Search and read records from Odoo in a single RPC
         
         Args:
             model: Odoo model name
             domain: Search domain
             fields: List of fields to read
             limit: Maximum number of records to return
-            
+        
         Returns:
             List of records
         """
         try:
-            # First search for record IDs
-            search_result = self.execute_method(
-                model,
-                "search",
-                [domain],
-                {"limit": limit} if limit else {}
-            )
-            
-            if "error" in search_result:
-                return []
-            
-            record_ids = search_result.get("result", [])
-            if not record_ids:
-                return []
+            kwargs = {"fields": fields}
+            if limit:
+                kwargs["limit"] = limit
             
-            # Then read the records
-            read_result = self.execute_method(
-                model,
-                "read",
-                [record_ids, fields]
-            )
+            result = await self.execute_method(model, "search_read", [domain], kwargs)
             
-            if "error" in read_result:
+            if "error" in result:
                 return []
             
-            return read_result.get("result", [])
-            
+            return result.get("result") or []
+        
         except Exception as e:
             logger.error(f"Erreur lors de search_read: {str(e)}")
             return []
     
-    def read(self, model: str, record_id: int, fields: list) -> dict:
+    async def read(self, model: str, record_id: int, fields: list) -> dict:
         """Read a specific record from Odoo
         
         Args:
             model: Odoo model name
             record_id: ID of the record to read
             fields: List of fields to read
-            
+        
         Returns:
             Record data
         """
         try:
-            result = self.execute_method(
+            result = await self.execute_method(
                 model,
                 "read",
-                [record_id, fields]
+                [[record_id], fields]
             )
             
             if "error" in result:
@@ -168,15 +450,96 @@ class OdooClient:
             
             records = result.get("result", [])
             return records[0] if records else {}
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de read: {str(e)}")
             return {}
     
-    def test_connection(self) -> bool:
-        """Tester la connexion à Odoo"""
+    async def read_many(self, model: str, ids: List[int], fields: list = None, chunk_size: int = None) -> Dict[str, Any]:
+        """Read many records by ID, in concurrent chunks
+        
+        Args:
+            model: Odoo model name
+            ids: IDs of the records to read
+            fields: List of fields to read (all fields if empty)
+            chunk_size: Number of IDs per RPC (ODOO_READ_CHUNK_SIZE by default)
+        
+        Returns:
+            {"result": records} in the order of ``ids``, or {"error": ...} if a chunk failed
+        """
+        chunk_size = chunk_size or ODOO_READ_CHUNK_SIZE
+        kwargs = {"fields": fields} if fields else {}
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        if len(chunks) <= 1:
+            return await self.execute_method(model, "read", [ids], kwargs)
+        
+        semaphore = asyncio.Semaphore(ODOO_READ_CONCURRENCY)
+        
+        async def read_chunk(chunk: List[int]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_method(model, "read", [chunk], kwargs)
+        
+        results = await asyncio.gather(*(read_chunk(chunk) for chunk in chunks))
+        
+        records = []
+        for result in results:
+            if "error" in result:
+                return result
+            records.extend(result.get("result") or [])
+        return {"result": records}
+    
+    async def iter_search_read(
+        self,
+        model: str,
+        domain: list,
+        fields: list = None,
+        page_size: int = None,
+        cursor: int = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over a search_read page by page, by increasing ID ranges
+        
+        Paging on ``id > cursor`` instead of ``offset`` keeps each page cheap
+        on the Odoo side and makes the iteration resumable.
+        
+        Args:
+            model: Odoo model name
+            domain: Search domain
+            fields: List of fields to read (all fields if empty)
+            page_size: Records per RPC (ODOO_STREAM_PAGE_SIZE by default)
+            cursor: Resume after this record ID
+        
+        Yields:
+            {"records": [...], "cursor": last_id} per page, or a final {"error": ...}
+        """
+        page_size = page_size or ODOO_STREAM_PAGE_SIZE
+        kwargs = {"limit": page_size, "order": "id asc"}
+        if fields:
+            kwargs["fields"] = fields
+        
+        while True:
+            page_domain = list(domain) + [["id", ">", cursor]] if cursor else list(domain)
+            try:
+                result = await self.execute_method(model, "search_read", [page_domain], kwargs)
+            except SchedulerOverflow as e:
+                result = {"error": str(e)}
+            if "error" in result:
+                yield result
+                return
+            
+            records = result.get("result") or []
+            if not records:
+                return
+            
+            cursor = records[-1]["id"]
+            yield {"records": records, "cursor": cursor}
+            
+            if len(records) < page_size:
+                return
+    
+    async def test_connection(self) -> bool:
+        """Tester la connexion à Odoo (toujours un appel réel, sans cache de résultats)"""
         try:
-            result = self.execute_method("res.users", "search_read", [[], ["id", "name"], 0, 1])
+            result = await self._fetch("res.users", "search_read", [[], ["id", "name"], 0, 1], {})
             return "error" not in result
         except Exception as e:
             logger.error(f"Erreur lors du test de connexion: {e}")
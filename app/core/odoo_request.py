@@ -0,0 +1,335 @@
+"""
+Normalisation des appels Odoo, commune aux outils MCP et à l'API REST
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+
+from .result_cache import make_cache_key
+from .schema_registry import schema_registry
+from .limits import limit_policy
+from .odoo_client import ODOO_STREAM_PAGE_SIZE
+from .streaming import STREAM_MAX_RECORDS
+from . import metrics
+
+ODOO_MAX_IDS = int(os.getenv("ODOO_MAX_IDS", "1000"))
+# Compter le total (search_count, en parallèle) pour les métadonnées de pagination
+ODOO_TOTAL_COUNT = os.getenv("ODOO_TOTAL_COUNT", "true").lower() == "true"
+
+# Validation précompilée
+MODEL_NAME_RE = re.compile(r"^[a-z0-9_]+(\.[a-z0-9_]+)*$")
+METHOD_NAME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9_]*$")
+# Champs lus (fields) : noms simples ; chemins pointés (partner_id.name) : domaines seulement
+FIELD_NAME_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+FIELD_PATH_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*(\.[a-zA-Z_][a-zA-Z0-9_]*)*$")
+
+DOMAIN_OPERATORS = frozenset({
+    "=", "!=", "<>", ">", ">=", "<", "<=", "=?", "like", "not like", "ilike", "not ilike",
+    "=like", "=ilike", "in", "not in", "child_of", "parent_of", "any", "not any"
+})
+# Opérateurs logiques (notation préfixe) et leur arité
+LOGICAL_OPERATORS = {"&": 2, "|": 2, "!": 1}
+
+DOMAIN_METHODS = frozenset({"search", "search_read"})
+
+class InvalidOdooRequest(ValueError):
+    """Arguments d'appel Odoo invalides"""
+
+class OdooRequest:
+    """Appel Odoo normalisé : arguments prêts pour execute_kw
+    
+    Immuable après construction ; deux appels équivalents (mêmes valeurs,
+    quelle que soit leur forme d'origine) ont la même ``cache_key``.
+    """
+    
+    __slots__ = ("model", "method", "args", "kwargs", "cache_key")
+    
+    def __init__(self, model: str, method: str, args: list, kwargs: dict):
+        self.model = model
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.cache_key = make_cache_key(model, method, args, kwargs)
+    
+    @property
+    def fields(self) -> Optional[List[str]]:
+        return self.kwargs.get("fields")
+    
+    def with_fields(self, fields: Optional[List[str]]) -> "OdooRequest":
+        """Copie avec la liste de champs résolue"""
+        if not fields:
+            return self
+        return OdooRequest(self.model, self.method, self.args, {**self.kwargs, "fields": fields})
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, OdooRequest) and self.cache_key == other.cache_key
+    
+    def __hash__(self) -> int:
+        return hash(self.cache_key)
+    
+    def __repr__(self) -> str:
+        return f"OdooRequest({self.model}.{self.method}, args={self.args!r}, kwargs={self.kwargs!r})"
+
+def _load_json(value: Any, name: str) -> Any:
+    """Valeur JSON native, ou texte JSON à décoder"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        raise InvalidOdooRequest(f"'{name}' n'est pas un JSON valide: {e}")
+
+def _check_leaf(term: Any, position: int):
+    if not isinstance(term, (list, tuple)) or len(term) != 3:
+        raise InvalidOdooRequest(f"Domaine: l'élément {position} doit être [champ, opérateur, valeur] ou '&', '|', '!'")
+    field, operator, _ = term
+    # (1, '=', 1) et (0, '=', 1) : feuilles toujours vraie / fausse
+    if field in (0, 1) and not isinstance(field, bool):
+        return
+    if not isinstance(field, str) or not FIELD_PATH_RE.match(field):
+        raise InvalidOdooRequest(f"Domaine: champ invalide {field!r} (élément {position})")
+    if not isinstance(operator, str) or operator.lower() not in DOMAIN_OPERATORS:
+        raise InvalidOdooRequest(f"Domaine: opérateur inconnu {operator!r} (élément {position})")
+
+def parse_domain(value: Any) -> list:
+    """Domaine de recherche validé structurellement
+    
+    Accepte une liste ou son texte JSON. Chaque élément est une feuille
+    [champ, opérateur, valeur] ou un opérateur logique ; les opérateurs
+    doivent avoir assez d'opérandes (notation préfixe).
+    """
+    if value is None or value == "":
+        return []
+    domain = _load_json(value, "domain")
+    if not isinstance(domain, list):
+        raise InvalidOdooRequest("'domain' doit être un tableau JSON")
+    
+    # Lecture de droite à gauche : chaque opérateur consomme ses opérandes
+    operands = 0
+    for position in range(len(domain) - 1, -1, -1):
+        term = domain[position]
+        if isinstance(term, str):
+            arity = LOGICAL_OPERATORS.get(term)
+            if arity is None:
+                raise InvalidOdooRequest(f"Domaine: opérateur logique inconnu {term!r} (élément {position})")
+            if operands < arity:
+                raise InvalidOdooRequest(f"Domaine: opérandes manquants pour {term!r} (élément {position})")
+            operands -= arity - 1
+        else:
+            _check_leaf(term, position)
+            operands += 1
+    return [list(term) if isinstance(term, tuple) else term for term in domain]
+
+def parse_fields(value: Any) -> Optional[List[str]]:
+    """Liste de champs, depuis une liste ou un texte "a,b,c" """
+    if value is None or value == "" or value == []:
+        return None
+    if isinstance(value, str):
+        value = [name.strip() for name in value.split(",") if name.strip()]
+    if not isinstance(value, list):
+        raise InvalidOdooRequest("'fields' doit être une liste de noms de champs")
+    for name in value:
+        if not isinstance(name, str) or not FIELD_NAME_RE.match(name):
+            hint = " (chemins pointés acceptés dans le domaine uniquement)" if isinstance(name, str) and FIELD_PATH_RE.match(name) else ""
+            raise InvalidOdooRequest(f"'fields': nom de champ invalide {name!r}{hint}")
+    return value
+
+def parse_ids(value: Any, max_ids: int = None) -> List[int]:
+    """Identifiants depuis une liste, un tableau JSON ou un texte "1,2,3" """
+    max_ids = max_ids or ODOO_MAX_IDS
+    if isinstance(value, str):
+        text = value.strip()
+        value = _load_json(text, "ids") if text.startswith("[") else [part.strip() for part in text.split(",") if part.strip()]
+    if isinstance(value, int) and not isinstance(value, bool):
+        value = [value]
+    if not isinstance(value, list):
+        raise InvalidOdooRequest("'ids' doit être une liste d'identifiants")
+    
+    ids = []
+    for item in value:
+        try:
+            record_id = int(item)
+        except (TypeError, ValueError):
+            raise InvalidOdooRequest(f"'ids': identifiant invalide {item!r}")
+        if isinstance(item, bool) or record_id <= 0 or (isinstance(item, float) and not item.is_integer()):
+            raise InvalidOdooRequest(f"'ids': identifiant invalide {item!r}")
+        ids.append(record_id)
+    if len(ids) > max_ids:
+        raise InvalidOdooRequest(f"'ids': {len(ids)} identifiants, maximum {max_ids}")
+    return ids
+
+def parse_values(value: Any, allow_list: bool = False) -> Union[dict, List[dict]]:
+    """Valeurs d'écriture : objet (ou liste d'objets pour create), natif ou JSON"""
+    values = _load_json(value, "values")
+    if isinstance(values, dict):
+        return values
+    if allow_list and isinstance(values, list) and values and all(isinstance(item, dict) for item in values):
+        if len(values) > ODOO_MAX_IDS:
+            raise InvalidOdooRequest(f"'values': {len(values)} enregistrements, maximum {ODOO_MAX_IDS}")
+        return values
+    raise InvalidOdooRequest("'values' doit être un objet JSON" + (" ou une liste d'objets" if allow_list else ""))
+
+def _parse_count(value: Any, name: str) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise InvalidOdooRequest(f"'{name}' doit être un entier positif ou nul")
+    return value
+
+def parse_limit(value: Any, model: str, host: Optional[str] = None) -> int:
+    """Limite effective : défaut du tenant/modèle si absente ou 0, bornée à son maximum"""
+    return limit_policy.resolve(host, model, _parse_count(value, "limit"))
+
+def parse_offset(value: Any) -> int:
+    return _parse_count(value, "offset")
+
+def _parse_size(value: Any, name: str) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise InvalidOdooRequest(f"'{name}' doit être un entier strictement positif")
+    return value
+
+def parse_page_size(value: Any, model: str, host: Optional[str] = None) -> int:
+    """Taille de page d'une lecture en flux, bornée à la limite maximale du tenant/modèle"""
+    page_size = _parse_size(value, "page_size") or ODOO_STREAM_PAGE_SIZE
+    return min(page_size, limit_policy.limits_for(host, model)[1])
+
+def parse_max_records(value: Any) -> int:
+    """Nombre d'enregistrements d'une lecture en flux, au plus STREAM_MAX_RECORDS"""
+    return min(_parse_size(value, "max_records") or STREAM_MAX_RECORDS, STREAM_MAX_RECORDS)
+
+def parse_cursor(value: Any) -> Optional[int]:
+    """Identifiant après lequel reprendre une lecture en flux (aucun si absent ou 0)"""
+    return _parse_count(value, "cursor") or None
+
+def normalize_request(
+    model: Any,
+    method: Any,
+    domain: Any = None,
+    fields: Any = None,
+    limit: Any = None,
+    ids: Any = None,
+    values: Any = None,
+    offset: Any = None,
+    host: Optional[str] = None
+) -> OdooRequest:
+    """Construire les arguments execute_kw d'un appel de l'outil universel
+    
+    ``host`` (instance Odoo du tenant) sélectionne ses limites de recherche.
+    
+    Raises:
+        InvalidOdooRequest: argument manquant, malformé ou hors limites
+    """
+    if not isinstance(model, str) or not MODEL_NAME_RE.match(model):
+        raise InvalidOdooRequest(f"Modèle invalide: {model!r}")
+    if not isinstance(method, str) or not METHOD_NAME_RE.match(method):
+        raise InvalidOdooRequest(f"Méthode invalide: {method!r}")
+    
+    args = []
+    kwargs = {}
+    
+    if method in DOMAIN_METHODS:
+        args.append(parse_domain(domain))
+        field_list = parse_fields(fields)
+        if field_list:
+            kwargs["fields"] = field_list
+        kwargs["limit"] = parse_limit(limit, model, host)
+        parsed_offset = parse_offset(offset)
+        if parsed_offset:
+            kwargs["offset"] = parsed_offset
+    
+    elif method == "read":
+        if not ids:
+            raise InvalidOdooRequest("'ids' requis pour la méthode 'read'")
+        args.append(parse_ids(ids))
+        field_list = parse_fields(fields)
+        if field_list:
+            kwargs["fields"] = field_list
+    
+    elif method == "create":
+        if not values:
+            raise InvalidOdooRequest("'values' requis pour la méthode 'create'")
+        parsed_values = parse_values(values, allow_list=True)
+        args.append(parsed_values if isinstance(parsed_values, list) else [parsed_values])
+    
+    elif method == "write":
+        if not ids:
+            raise InvalidOdooRequest("'ids' requis pour la méthode 'write'")
+        if not values:
+            raise InvalidOdooRequest("'values' requis pour la méthode 'write'")
+        args.append(parse_ids(ids))
+        args.append(parse_values(values))
+    
+    elif method == "unlink":
+        if not ids:
+            raise InvalidOdooRequest("'ids' requis pour la méthode 'unlink'")
+        args.append(parse_ids(ids))
+    
+    return OdooRequest(model, method, args, kwargs)
+
+async def execute_request(odoo_client, request: OdooRequest, entry: str = "") -> Dict[str, Any]:
+    """Exécuter un appel normalisé pour un tenant
+    
+    Les champs demandés sont validés localement (ou remplacés par la
+    sélection par défaut) ; les lectures d'IDs sont découpées en lots.
+    Durée et issue sont mesurées par point d'entrée (``entry``).
+    
+    Raises:
+        ValueError: champ inconnu sur le modèle
+    """
+    labels = (entry, metrics.tenant_label(odoo_client.host), request.model, request.method)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await _execute_request(odoo_client, request)
+        if "error" not in result:
+            outcome = "ok"
+        return result
+    finally:
+        metrics.call_duration.observe(time.perf_counter() - started, *labels)
+        metrics.calls.inc(*labels, outcome)
+
+async def _execute_request(odoo_client, request: OdooRequest) -> Dict[str, Any]:
+    if request.method in ("search_read", "read"):
+        request = request.with_fields(await schema_registry.resolve_fields(odoo_client, request.model, request.fields))
+    
+    if request.method == "read":
+        return await odoo_client.read_many(request.model, request.args[0], request.fields)
+    if request.method not in DOMAIN_METHODS:
+        return await odoo_client.execute_method(request.model, request.method, request.args, request.kwargs)
+    
+    search = odoo_client.execute_method(request.model, request.method, request.args, request.kwargs)
+    if not ODOO_TOTAL_COUNT:
+        return with_pagination(await search, request.kwargs)
+    result, count = await asyncio.gather(
+        search,
+        odoo_client.execute_method(request.model, "search_count", request.args[:1], {})
+    )
+    total_count = count.get("result")
+    return with_pagination(result, request.kwargs, total_count if isinstance(total_count, int) else None)
+
+def with_pagination(result: Dict[str, Any], kwargs: dict, total_count: Optional[int] = None) -> Dict[str, Any]:
+    """Ajouter offset, limit, next_offset (et total_count s'il est connu) à un résultat de recherche
+    
+    ``next_offset`` vaut None une fois la dernière page atteinte.
+    """
+    records = result.get("result")
+    if "error" in result or not isinstance(records, list):
+        return result
+    
+    offset, limit = kwargs.get("offset", 0), kwargs["limit"]
+    end = offset + len(records)
+    if total_count is not None:
+        has_more = end < total_count
+    else:
+        has_more = len(records) >= limit
+    
+    page = {**result, "offset": offset, "limit": limit, "next_offset": end if has_more else None}
+    if total_count is not None:
+        page["total_count"] = total_count
+    return page
@@ -0,0 +1,139 @@
+"""
+Limitation de débit par token API et par utilisateur (token bucket)
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./rate_limits.db")
+
+# Requêtes par seconde (et rafale autorisée) ; 0 désactive la limite
+RATE_LIMIT_TOKEN_RPS = float(os.getenv("RATE_LIMIT_TOKEN_RPS", "10"))
+RATE_LIMIT_TOKEN_BURST = float(os.getenv("RATE_LIMIT_TOKEN_BURST", "20"))
+RATE_LIMIT_USER_RPS = float(os.getenv("RATE_LIMIT_USER_RPS", "20"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "40"))
+
+# Appels Odoo par minute ; 0 désactive la limite
+RATE_LIMIT_TOKEN_CALLS_PER_MINUTE = float(os.getenv("RATE_LIMIT_TOKEN_CALLS_PER_MINUTE", "600"))
+RATE_LIMIT_USER_CALLS_PER_MINUTE = float(os.getenv("RATE_LIMIT_USER_CALLS_PER_MINUTE", "1200"))
+
+class RateLimitExceeded(Exception):
+    """Limite de débit atteinte pour un token ou un utilisateur"""
+    
+    def __init__(self, message: str, retry_after: float = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, capacity: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+class MemoryRateLimitBackend:
+    """Seaux en mémoire du processus (un worker)"""
+    
+    blocking = False
+    
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def consume(self, key: str, rate: float, capacity: float, cost: float = 1) -> Tuple[bool, float]:
+        """Prélever ``cost`` jetons ; retourne (autorisé, secondes avant nouvel essai)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, rate, capacity)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+class SQLiteRateLimitBackend:
+    """Seaux partagés entre workers via un fichier SQLite local"""
+    
+    blocking = True
+    
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+    
+    def consume(self, key: str, rate: float, capacity: float, cost: float = 1) -> Tuple[bool, float]:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(*row, now, rate, capacity) if row else capacity
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "sqlite":
+        return SQLiteRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+class RateLimiter:
+    """Limites par token et par utilisateur : requêtes/s et appels Odoo/min"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self.rejected = 0
+    
+    async def _consume(self, key: str, rate: float, capacity: float, cost: float) -> Tuple[bool, float]:
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.backend.consume, key, rate, capacity, cost)
+        return self.backend.consume(key, rate, capacity, cost)
+    
+    async def _check(self, buckets, cost: float, what: str):
+        for key, rate, capacity in buckets:
+            if rate <= 0:
+                continue
+            allowed, retry_after = await self._consume(key, rate, capacity, cost)
+            if not allowed:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Limite de {what} atteinte", retry_after=max(1, retry_after))
+    
+    async def check_request(self, token: str, user_id: Optional[str]):
+        """Une requête HTTP authentifiée"""
+        buckets = [(f"req:token:{token}", RATE_LIMIT_TOKEN_RPS, RATE_LIMIT_TOKEN_BURST)]
+        if user_id:
+            buckets.append((f"req:user:{user_id}", RATE_LIMIT_USER_RPS, RATE_LIMIT_USER_BURST))
+        await self._check(buckets, 1, "requêtes")
+    
+    async def check_odoo_calls(self, token: str, user_id: Optional[str], count: int = 1):
+        """``count`` appels Odoo sur le point d'être exécutés"""
+        buckets = [(f"calls:token:{token}", RATE_LIMIT_TOKEN_CALLS_PER_MINUTE / 60, RATE_LIMIT_TOKEN_CALLS_PER_MINUTE)]
+        if user_id:
+            buckets.append((f"calls:user:{user_id}", RATE_LIMIT_USER_CALLS_PER_MINUTE / 60, RATE_LIMIT_USER_CALLS_PER_MINUTE))
+        await self._check(buckets, count, "appels Odoo")
+
+rate_limiter = RateLimiter()
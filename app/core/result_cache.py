@@ -0,0 +1,146 @@
+"""
+Cache de résultats par tenant pour les méthodes Odoo en lecture seule
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Méthodes sans effet de bord, dont le résultat peut être mis en cache
+READ_ONLY_METHODS = frozenset({
+    "search", "search_read", "search_count", "read", "fields_get", "name_search", "name_get"
+})
+
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_DEFAULT_TTL = float(os.getenv("RESULT_CACHE_DEFAULT_TTL", "0"))
+
+# TTL (secondes) par modèle ; 0 = pas de cache. Surchargeable via RESULT_CACHE_TTL_POLICY (JSON).
+DEFAULT_TTL_POLICY = {
+    "res.country": 3600,
+    "res.country.state": 3600,
+    "res.currency": 3600,
+    "res.lang": 3600,
+    "uom.uom": 3600,
+    "uom.category": 3600,
+    "product.category": 600,
+    "res.users": 60,
+}
+RESULT_CACHE_TTL_POLICY = {**DEFAULT_TTL_POLICY, **json.loads(os.getenv("RESULT_CACHE_TTL_POLICY", "{}"))}
+
+def make_cache_key(model: str, method: str, args: list, kwargs: dict) -> str:
+    """Clé normalisée (ordre des kwargs indifférent)"""
+    return json.dumps([model, method, args or [], kwargs or {}], sort_keys=True, separators=(",", ":"), default=str)
+
+class _CacheEntry:
+    __slots__ = ("expires_at", "size", "model", "value")
+    
+    def __init__(self, expires_at: float, size: int, model: str, value: Dict[str, Any]):
+        self.expires_at = expires_at
+        self.size = size
+        self.model = model
+        self.value = value
+
+class ResultCache:
+    """Cache LRU borné en mémoire, indexé par (tenant, clé normalisée)
+    
+    Les entrées d'un modèle sont invalidées dès que le même tenant y appelle
+    une méthode qui n'est pas en lecture seule (create, write, unlink, ...).
+    Chaque invalidation incrémente la génération du modèle : une lecture
+    commencée avant une écriture terminée entre-temps n'est pas mise en cache.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        default_ttl: float = RESULT_CACHE_DEFAULT_TTL,
+        ttl_policy: Optional[Dict[str, float]] = None
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_policy = RESULT_CACHE_TTL_POLICY if ttl_policy is None else ttl_policy
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._by_model: Dict[Tuple[str, str], set] = {}
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def ttl_for(self, model: str, method: str) -> float:
+        """TTL applicable, 0 si l'appel ne doit pas être mis en cache"""
+        if method not in READ_ONLY_METHODS:
+            return 0
+        return self.ttl_policy.get(model, self.default_ttl)
+    
+    def _remove(self, entry_key: Tuple[str, str]):
+        entry = self._entries.pop(entry_key)
+        self._bytes -= entry.size
+        keys = self._by_model.get((entry_key[0], entry.model))
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._by_model[(entry_key[0], entry.model)]
+    
+    def get(self, tenant: str, key: str) -> Optional[Dict[str, Any]]:
+        entry_key = (tenant, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(entry_key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return dict(entry.value)
+    
+    def generation(self, tenant: str, model: str) -> int:
+        """Génération courante du modèle pour le tenant (à lire avant l'appel Odoo)"""
+        return self._generations.get((tenant, model), 0)
+    
+    def set(self, tenant: str, model: str, key: str, value: Dict[str, Any], ttl: float, generation: Optional[int] = None):
+        size = len(key) + len(json.dumps(value, separators=(",", ":"), default=str))
+        if size > self.max_bytes:
+            return
+        entry_key = (tenant, key)
+        with self._lock:
+            # Écriture sur le modèle pendant la lecture : le résultat est peut-être périmé
+            if generation is not None and generation != self._generations.get((tenant, model), 0):
+                return
+            if entry_key in self._entries:
+                self._remove(entry_key)
+            self._entries[entry_key] = _CacheEntry(time.monotonic() + ttl, size, model, value)
+            self._by_model.setdefault((tenant, model), set()).add(entry_key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate_model(self, tenant: str, model: str):
+        """Oublier les résultats d'un modèle pour un tenant"""
+        with self._lock:
+            self._generations[(tenant, model)] = self._generations.get((tenant, model), 0) + 1
+            for entry_key in list(self._by_model.get((tenant, model), ())):
+                self._remove(entry_key)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_model.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+result_cache = ResultCache()
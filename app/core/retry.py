@@ -0,0 +1,115 @@
+"""
+Nouvelles tentatives des appels Odoo idempotents sur erreur transitoire
+"""
+
+import os
+import time
+import random
+import asyncio
+import httpx
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+
+from .result_cache import READ_ONLY_METHODS
+
+ODOO_RETRY_ATTEMPTS = int(os.getenv("ODOO_RETRY_ATTEMPTS", "3"))
+ODOO_RETRY_BASE_DELAY = float(os.getenv("ODOO_RETRY_BASE_DELAY", "0.2"))
+ODOO_RETRY_MAX_DELAY = float(os.getenv("ODOO_RETRY_MAX_DELAY", "2"))
+ODOO_RETRY_DEADLINE = float(os.getenv("ODOO_RETRY_DEADLINE", "10"))
+REQUEST_BUDGET = float(os.getenv("REQUEST_BUDGET", "30"))
+
+# Échéance (time.monotonic) de la requête HTTP en cours, None hors requête
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Méthodes sans effet de bord : les rejouer ne change rien côté Odoo
+IDEMPOTENT_METHODS = READ_ONLY_METHODS | frozenset({
+    "read_group", "search_fetch", "web_search_read", "web_read", "web_read_group",
+    "default_get", "get_views", "fields_view_get", "check_access_rights", "name_get"
+})
+
+TRANSIENT_STATUS_CODES = frozenset({502, 503, 504})
+
+# Conflits de transaction PostgreSQL remontés par Odoo dans l'erreur JSON-RPC
+TRANSIENT_ERROR_MARKERS = (
+    "SerializationFailure",
+    "could not serialize access",
+    "concurrent update",
+    "TransactionRollbackError",
+    "LockNotAvailable",
+)
+
+def is_idempotent(method: str) -> bool:
+    return method in IDEMPOTENT_METHODS or method.startswith("search")
+
+def is_transient_exception(error: BaseException) -> bool:
+    """Coupure réseau, timeout ou passerelle indisponible (502/503/504)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (httpx.NetworkError, httpx.TimeoutException, httpx.RemoteProtocolError))
+
+def is_transient_error(error: Any) -> bool:
+    """Erreur JSON-RPC Odoo due à un conflit de transaction"""
+    return any(marker in str(error) for marker in TRANSIENT_ERROR_MARKERS)
+
+class RetryPolicy:
+    """Tentatives bornées avec backoff exponentiel à gigue complète
+    
+    Aucune tentative n'est lancée (ni attendue) au-delà de l'échéance la plus
+    proche entre ``deadline`` secondes et celle de la requête en cours.
+    """
+    
+    def __init__(
+        self,
+        attempts: int = ODOO_RETRY_ATTEMPTS,
+        base_delay: float = ODOO_RETRY_BASE_DELAY,
+        max_delay: float = ODOO_RETRY_MAX_DELAY,
+        deadline: float = ODOO_RETRY_DEADLINE
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retries = 0
+    
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    async def call(self, method: str, rpc: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Exécuter ``rpc`` en le rejouant sur erreur transitoire si ``method`` est idempotente
+        
+        Après la dernière tentative, l'erreur est rendue telle quelle
+        (réponse JSON-RPC en erreur ou exception levée).
+        """
+        if not is_idempotent(method) or self.attempts == 1:
+            return await rpc()
+        
+        deadline = time.monotonic() + self.deadline
+        budget = request_deadline.get()
+        if budget is not None:
+            deadline = min(deadline, budget)
+        
+        attempt = 0
+        while True:
+            try:
+                response = await rpc()
+                if "error" not in response or not is_transient_error(response["error"]):
+                    return response
+                failure = None
+            except Exception as e:
+                if not is_transient_exception(e):
+                    raise
+                failure = e
+            
+            attempt += 1
+            delay = self.backoff(attempt)
+            if attempt >= self.attempts or time.monotonic() + delay >= deadline:
+                if failure is not None:
+                    raise failure
+                return response
+            
+            self.retries += 1
+            logger.warning(f"Erreur transitoire Odoo sur {method} ({failure or 'conflit de transaction'}), tentative {attempt + 1} dans {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+retry_policy = RetryPolicy()
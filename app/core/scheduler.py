@@ -0,0 +1,144 @@
+"""
+Ordonnanceur des appels sortants vers Odoo (limites par tenant et par hôte)
+"""
+
+import os
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict
+
+SCHEDULER_TENANT_CONCURRENCY = int(os.getenv("SCHEDULER_TENANT_CONCURRENCY", "8"))
+SCHEDULER_HOST_CONCURRENCY = int(os.getenv("SCHEDULER_HOST_CONCURRENCY", "32"))
+SCHEDULER_TENANT_QUEUE = int(os.getenv("SCHEDULER_TENANT_QUEUE", "64"))
+SCHEDULER_MAX_WAIT = float(os.getenv("SCHEDULER_MAX_WAIT", "10"))
+
+class SchedulerOverflow(Exception):
+    """File d'attente du tenant pleine, ou attente trop longue"""
+    
+    def __init__(self, message: str, retry_after: float = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class OdooCallScheduler:
+    """Limite les appels Odoo en cours par tenant et par hôte
+    
+    Les appels en excès attendent dans une file par tenant. Quand une place se
+    libère sur un hôte, les tenants en attente sont servis à tour de rôle
+    (round-robin) : un tenant bruyant ne peut pas affamer les autres.
+    """
+    
+    def __init__(
+        self,
+        tenant_concurrency: int = SCHEDULER_TENANT_CONCURRENCY,
+        host_concurrency: int = SCHEDULER_HOST_CONCURRENCY,
+        tenant_queue: int = SCHEDULER_TENANT_QUEUE,
+        max_wait: float = SCHEDULER_MAX_WAIT
+    ):
+        self.tenant_concurrency = tenant_concurrency
+        self.host_concurrency = host_concurrency
+        self.tenant_queue = tenant_queue
+        self.max_wait = max_wait
+        self._tenant_inflight: Dict[str, int] = {}
+        self._host_inflight: Dict[str, int] = {}
+        # Par hôte : tenants en attente, dans l'ordre de service
+        self._queues: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {}
+        self.rejected = 0
+    
+    def _can_run(self, tenant: str, host: str) -> bool:
+        return (
+            self._tenant_inflight.get(tenant, 0) < self.tenant_concurrency
+            and self._host_inflight.get(host, 0) < self.host_concurrency
+        )
+    
+    def _grant(self, tenant: str, host: str):
+        self._tenant_inflight[tenant] = self._tenant_inflight.get(tenant, 0) + 1
+        self._host_inflight[host] = self._host_inflight.get(host, 0) + 1
+    
+    def _release(self, tenant: str, host: str):
+        self._tenant_inflight[tenant] -= 1
+        if not self._tenant_inflight[tenant]:
+            del self._tenant_inflight[tenant]
+        self._host_inflight[host] -= 1
+        if not self._host_inflight[host]:
+            del self._host_inflight[host]
+        self._dispatch(host)
+    
+    def _dispatch(self, host: str):
+        """Attribuer les places libres de l'hôte, un tenant après l'autre"""
+        queues = self._queues.get(host)
+        while queues and self._host_inflight.get(host, 0) < self.host_concurrency:
+            granted = False
+            for tenant in list(queues):
+                waiters = queues[tenant]
+                if self._tenant_inflight.get(tenant, 0) >= self.tenant_concurrency:
+                    continue
+                future = waiters.popleft()
+                if not waiters:
+                    del queues[tenant]
+                else:
+                    queues.move_to_end(tenant)
+                self._grant(tenant, host)
+                future.set_result(None)
+                granted = True
+                break
+            if not granted:
+                break
+        if queues is not None and not queues:
+            del self._queues[host]
+    
+    async def acquire(self, tenant: str, host: str):
+        if self._can_run(tenant, host) and host not in self._queues:
+            self._grant(tenant, host)
+            return
+        
+        queues = self._queues.setdefault(host, OrderedDict())
+        waiters = queues.setdefault(tenant, deque())
+        if len(waiters) >= self.tenant_queue:
+            if not waiters:
+                del queues[tenant]
+            self.rejected += 1
+            raise SchedulerOverflow("Trop d'appels Odoo en attente pour ce tenant")
+        
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        # Servir tout de suite si une place est libre pour ce tenant
+        self._dispatch(host)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # La place a été attribuée entre-temps : la rendre
+                self._release(tenant, host)
+            else:
+                future.cancel()
+                waiters = self._queues.get(host, {}).get(tenant)
+                if waiters is not None and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._queues[host][tenant]
+                        if not self._queues[host]:
+                            del self._queues[host]
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise SchedulerOverflow("Délai d'attente dépassé pour l'appel Odoo")
+            raise
+    
+    @asynccontextmanager
+    async def slot(self, tenant: str, host: str):
+        """Réserver une place pour un appel Odoo"""
+        await self.acquire(tenant, host)
+        try:
+            yield
+        finally:
+            self._release(tenant, host)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": sum(self._host_inflight.values()),
+            "queued": sum(len(w) for queues in self._queues.values() for w in queues.values()),
+            "hosts": len(self._host_inflight),
+            "rejected": self.rejected,
+        }
+
+call_scheduler = OdooCallScheduler()
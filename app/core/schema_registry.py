@@ -0,0 +1,91 @@
+"""
+Registre des schémas de modèles Odoo (fields_get) par tenant
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "3600"))
+SCHEMA_CACHE_MAX_MODELS = int(os.getenv("SCHEMA_CACHE_MAX_MODELS", "5000"))
+
+# Types exclus de la sélection de champs par défaut (taille de la réponse).
+# fields_get ne donne pas la taille d'un one2many : tous sont exclus par défaut,
+# un client qui en a besoin les demande explicitement dans ``fields``.
+SCHEMA_HEAVY_FIELD_TYPES = frozenset(
+    name.strip() for name in os.getenv("SCHEMA_HEAVY_FIELD_TYPES", "binary,html,one2many").split(",") if name.strip()
+)
+# Champs calculés non stockés gardés dans la sélection par défaut
+SCHEMA_KEPT_COMPUTED_FIELDS = frozenset({"display_name"})
+
+# Seuls attributs lus : le type et le stockage (un champ non stocké est calculé à chaque lecture)
+FIELD_ATTRIBUTES = ["type", "store"]
+
+class ModelSchemaRegistry:
+    """Schémas ``fields_get`` mis en cache par (tenant, modèle), chargés à la demande"""
+    
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL, max_models: int = SCHEMA_CACHE_MAX_MODELS):
+        self.ttl = ttl
+        self.max_models = max_models
+        self._schemas: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    async def get_fields(self, odoo_client, model: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Définition des champs du modèle, ou None si Odoo ne la fournit pas"""
+        key = (odoo_client.tenant_key, model)
+        with self._lock:
+            entry = self._schemas.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._schemas.move_to_end(key)
+                return entry[1]
+        
+        result = await odoo_client.execute_method(model, "fields_get", [], {"attributes": FIELD_ATTRIBUTES})
+        if "error" in result or not isinstance(result.get("result"), dict):
+            logger.warning(f"Schéma indisponible pour {model}: {result.get('error')}")
+            return None
+        
+        fields = result["result"]
+        with self._lock:
+            self._schemas[key] = (time.monotonic() + self.ttl, fields)
+            self._schemas.move_to_end(key)
+            while len(self._schemas) > self.max_models:
+                self._schemas.popitem(last=False)
+        return fields
+    
+    async def default_fields(self, odoo_client, model: str) -> Optional[List[str]]:
+        """Sélection légère : ni types lourds (binary, html, one2many), ni champs calculés non stockés"""
+        fields = await self.get_fields(odoo_client, model)
+        if fields is None:
+            return None
+        return [
+            name for name, spec in fields.items()
+            if spec.get("type") not in SCHEMA_HEAVY_FIELD_TYPES
+            and (spec.get("store", True) or name in SCHEMA_KEPT_COMPUTED_FIELDS)
+        ]
+    
+    async def resolve_fields(self, odoo_client, model: str, requested: Optional[List[str]]) -> Optional[List[str]]:
+        """Valider les champs demandés, ou proposer la sélection par défaut
+        
+        Raises:
+            ValueError: si un champ demandé n'existe pas sur le modèle
+        """
+        if not requested:
+            return await self.default_fields(odoo_client, model)
+        
+        fields = await self.get_fields(odoo_client, model)
+        if fields is not None:
+            unknown = [name for name in requested if name not in fields]
+            if unknown:
+                raise ValueError(f"Champs inconnus sur {model}: {', '.join(unknown)}")
+        return requested
+    
+    def invalidate(self, tenant_key: str, model: Optional[str] = None):
+        """Oublier le schéma d'un modèle, ou tous ceux d'un tenant"""
+        with self._lock:
+            for key in [k for k in self._schemas if k[0] == tenant_key and (model is None or k[1] == model)]:
+                del self._schemas[key]
+
+schema_registry = ModelSchemaRegistry()
@@ -0,0 +1,74 @@
+"""
+Sérialisation JSON des résultats d'outils (compacte par défaut, orjson si installé)
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Format par défaut des résultats d'outils : json (enregistrements) ou table (colonnes + lignes)
+TOOL_RESULT_FORMAT = os.getenv("TOOL_RESULT_FORMAT", "json")
+TOOL_RESULT_PRETTY = os.getenv("TOOL_RESULT_PRETTY", "false").lower() == "true"
+
+RESULT_FORMATS = ("json", "table")
+
+# Méthodes dont le résultat est une liste d'enregistrements
+RECORD_METHODS = frozenset({"search_read", "read"})
+
+def _default(value: Any) -> str:
+    return str(value)
+
+def _dumps_stdlib(value: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=_default)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+def dumps_bytes(value: Any, pretty: bool = False) -> bytes:
+    """Encoder en JSON UTF-8, compact ou indenté avec ``pretty``"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(value, default=_default, option=option)
+        except TypeError:
+            # Entiers hors 64 bits, etc. : repli sur la bibliothèque standard
+            pass
+    return _dumps_stdlib(value, pretty).encode("utf-8")
+
+def dumps(value: Any, pretty: bool = False) -> str:
+    """Comme ``dumps_bytes``, en texte"""
+    if orjson is not None:
+        return dumps_bytes(value, pretty).decode("utf-8")
+    return _dumps_stdlib(value, pretty)
+
+def to_table(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Liste d'enregistrements -> {"columns": [...], "rows": [[...], ...]}
+    
+    Les noms de champs ne sont écrits qu'une fois ; une valeur absente d'un
+    enregistrement vaut null.
+    """
+    columns: Dict[str, None] = {}
+    for record in records:
+        for name in record:
+            columns.setdefault(name)
+    names = list(columns)
+    return {"columns": names, "rows": [[record.get(name) for name in names] for record in records]}
+
+def resolve_format(result_format: Optional[str]) -> str:
+    """Format demandé, ou format par défaut ; ValueError si inconnu"""
+    result_format = result_format or TOOL_RESULT_FORMAT
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Format inconnu '{result_format}' (attendu: {', '.join(RESULT_FORMATS)})")
+    return result_format
+
+def format_tool_result(result: Dict[str, Any], method: str, result_format: str = None, pretty: bool = None) -> str:
+    """Texte renvoyé par un outil MCP pour un résultat ``{"result": ...}``"""
+    records = result.get("result")
+    if resolve_format(result_format) == "table" and method in RECORD_METHODS and isinstance(records, list) \
+            and all(isinstance(record, dict) for record in records):
+        result = {**result, "result": to_table(records)}
+    return dumps(result, TOOL_RESULT_PRETTY if pretty is None else pretty)
@@ -0,0 +1,132 @@
+"""
+Pool borné de sessions Odoo (un client authentifié par tenant)
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from sqlalchemy import event, inspect
+from loguru import logger
+
+from .models import User
+from .odoo_client import OdooClient
+from .token_cache import USER_WATCHED_ATTRS
+
+SESSION_POOL_MAX_SIZE = int(os.getenv("SESSION_POOL_MAX_SIZE", "1000"))
+SESSION_POOL_IDLE_TIMEOUT = float(os.getenv("SESSION_POOL_IDLE_TIMEOUT", "1800"))
+
+def _credentials_fingerprint(user: User) -> str:
+    """Empreinte des identifiants Odoo, pour détecter leur modification"""
+    raw = "\0".join([user.odoo_url, user.odoo_db, user.odoo_username, user.odoo_password])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class _PoolEntry:
+    __slots__ = ("client", "fingerprint", "last_used")
+    
+    def __init__(self, client: OdooClient, fingerprint: str):
+        self.client = client
+        self.fingerprint = fingerprint
+        self.last_used = time.monotonic()
+
+class OdooSessionPool:
+    """Pool LRU de clients Odoo indexé par tenant (User.user_id)
+    
+    Tous les tokens d'un même utilisateur partagent le même client authentifié.
+    Les entrées inutilisées depuis ``idle_timeout`` secondes sont évincées.
+    """
+    
+    def __init__(self, max_size: int = SESSION_POOL_MAX_SIZE, idle_timeout: float = SESSION_POOL_IDLE_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _evict_idle(self, now: float):
+        # Les entrées sont ordonnées par dernier usage : les plus anciennes en tête
+        while self._entries:
+            user_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used <= self.idle_timeout:
+                break
+            del self._entries[user_id]
+            self.evictions += 1
+    
+    def get(self, user_id: str) -> Optional[OdooClient]:
+        """Retourner le client du tenant s'il est dans le pool"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.last_used = now
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry.client
+    
+    def acquire(self, user: User) -> OdooClient:
+        """Retourner le client du tenant, en le (re)créant si besoin
+        
+        Un client dont les identifiants ne correspondent plus à ceux de
+        l'utilisateur est remplacé.
+        """
+        fingerprint = _credentials_fingerprint(user)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(user.user_id)
+            if entry is not None and entry.fingerprint == fingerprint:
+                entry.last_used = now
+                self._entries.move_to_end(user.user_id)
+                self.hits += 1
+                return entry.client
+            
+            self.misses += 1
+            entry = _PoolEntry(
+                OdooClient(user.odoo_url, user.odoo_db, user.odoo_username, user.odoo_password),
+                fingerprint
+            )
+            self._entries[user.user_id] = entry
+            self._entries.move_to_end(user.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return entry.client
+    
+    def invalidate(self, user_id: str):
+        """Retirer le client d'un tenant (identifiants modifiés, compte désactivé)"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                logger.info(f"Session Odoo retirée du pool pour l'utilisateur {user_id}")
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du pool"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+session_pool = OdooSessionPool()
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in USER_WATCHED_ATTRS):
+        session_pool.invalidate(target.user_id)
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    session_pool.invalidate(target.user_id)
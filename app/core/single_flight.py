@@ -0,0 +1,43 @@
+"""
+Regroupement des appels Odoo identiques en cours (single-flight)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Partage un même appel entre les demandeurs concurrents d'une même clé
+    
+    Le premier demandeur lance l'appel dans une tâche dédiée ; les suivants
+    attendent son résultat. Rien n'est conservé une fois l'appel terminé :
+    aucune donnée périmée ne peut être servie. L'annulation d'un demandeur
+    n'interrompt pas l'appel partagé (``asyncio.shield``).
+    """
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+    
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        # Un seul thread par boucle asyncio : pas de verrou nécessaire
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Résultat non attendu (tous les demandeurs annulés) : éviter l'avertissement asyncio
+        if not task.cancelled():
+            task.exception()
+    
+    def __len__(self):
+        return len(self._in_flight)
+
+odoo_single_flight = SingleFlight()
@@ -0,0 +1,69 @@
+"""
+Mise en forme des lectures paginées en flux (NDJSON, SSE)
+"""
+
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .serialization import dumps, dumps_bytes
+
+STREAM_MAX_RECORDS = int(os.getenv("STREAM_MAX_RECORDS", "5000"))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Empêche nginx de mettre le flux en tampon
+STREAMING_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def ndjson_line(payload: Dict[str, Any]) -> bytes:
+    return dumps_bytes(payload) + b"\n"
+
+def sse_event(message: Dict[str, Any]) -> bytes:
+    data = dumps(message)
+    return f"event: message\ndata: {data}\n\n".encode("utf-8")
+
+async def ndjson_stream(pages: AsyncIterator[Dict[str, Any]], cursor: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Une ligne par page, puis une ligne de fin avec le curseur de reprise
+    
+    Lignes émises :
+        {"type": "records", "records": [...], "cursor": 42}
+        {"type": "end", "count": 1000, "cursor": 42}
+        {"type": "error", "error": "...", "cursor": 42}
+    """
+    count = 0
+    async for page in pages:
+        if "error" in page:
+            yield ndjson_line({"type": "error", "error": str(page["error"]), "cursor": cursor})
+            return
+        cursor = page["cursor"]
+        count += len(page["records"])
+        yield ndjson_line({"type": "records", "records": page["records"], "cursor": cursor})
+    yield ndjson_line({"type": "end", "count": count, "cursor": cursor})
+
+async def collect_pages(
+    pages: AsyncIterator[Dict[str, Any]],
+    max_records: int = None,
+    cursor: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Accumuler au plus ``max_records`` enregistrements
+    
+    Émet {"progress": n} après chaque page, puis un dernier élément
+    {"records": [...], "count": n, "next_cursor": id | None} ou {"error": ...}.
+    ``next_cursor`` vaut None quand il n'y a plus rien à lire.
+    """
+    max_records = min(max_records or STREAM_MAX_RECORDS, STREAM_MAX_RECORDS)
+    records = []
+    next_cursor = None
+    async for page in pages:
+        if "error" in page:
+            yield {"error": page["error"], "next_cursor": cursor}
+            return
+        room = max_records - len(records)
+        records.extend(page["records"][:room])
+        cursor = records[-1]["id"]
+        yield {"progress": len(records)}
+        if len(records) >= max_records:
+            next_cursor = cursor
+            await pages.aclose()
+            break
+    yield {"records": records, "count": len(records), "next_cursor": next_cursor}
@@ -0,0 +1,104 @@
+"""
+Cache mémoire de résolution token API -> tenant
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event, inspect
+from loguru import logger
+
+from .models import User, APIToken
+
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+class ResolvedTenant:
+    """Tenant résolu à partir d'un token API
+
+    Ne contient aucun identifiant Odoo : le client authentifié vit dans le
+    pool de sessions, indexé par ``user_id``.
+    """
+    
+    def __init__(self, token: str, user_id: str):
+        self.token = token
+        self.user_id = user_id
+
+class TokenCache:
+    """Cache LRU borné avec TTL, indexé par token API"""
+    
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, token: str) -> Optional[ResolvedTenant]:
+        """Retourner le tenant en cache, ou None si absent ou expiré"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, tenant = entry
+            if expires_at < time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return tenant
+    
+    def set(self, token: str, tenant: ResolvedTenant):
+        """Mettre en cache la résolution d'un token"""
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl, tenant)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate_token(self, token: str):
+        """Oublier un token (désactivation, suppression)"""
+        with self._lock:
+            self._entries.pop(token, None)
+    
+    def invalidate_user(self, user_id: str):
+        """Oublier tous les tokens d'un utilisateur"""
+        with self._lock:
+            stale = [token for token, (_, tenant) in self._entries.items() if tenant.user_id == user_id]
+            for token in stale:
+                del self._entries[token]
+        if stale:
+            logger.info(f"Cache tokens invalidé pour l'utilisateur {user_id} ({len(stale)} entrées)")
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+token_cache = TokenCache()
+
+# Invalidation automatique lors des modifications via l'ORM
+USER_WATCHED_ATTRS = ("is_active", "odoo_url", "odoo_db", "odoo_username", "odoo_password")
+
+@event.listens_for(APIToken, "after_update")
+def _api_token_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.is_active.history.has_changes() or state.attrs.token.history.has_changes():
+        for token in state.attrs.token.history.sum():
+            token_cache.invalidate_token(token)
+
+@event.listens_for(APIToken, "after_delete")
+def _api_token_deleted(mapper, connection, target):
+    token_cache.invalidate_token(target.token)
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in USER_WATCHED_ATTRS):
+        token_cache.invalidate_user(target.user_id)
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    token_cache.invalidate_user(target.user_id)
@@ -0,0 +1,263 @@
+"""
+Traces par requête (spans chronométrés), compatibles OpenTelemetry
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Part des requêtes exportées (échantillonnage en tête) ; une requête entrante
+# marquée échantillonnée (traceparent) est toujours exportée
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+# Les traces plus lentes que ce seuil (secondes) sont exportées même non échantillonnées
+TRACING_SLOW_THRESHOLD = float(os.getenv("TRACING_SLOW_THRESHOLD", "2"))
+# Fichier JSON Lines au format OTLP/JSON (lisible par un collecteur OpenTelemetry)
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH", "./traces.jsonl")
+TRACING_MAX_SPANS = int(os.getenv("TRACING_MAX_SPANS", "500"))
+# Traces en attente d'écriture ; au-delà (disque trop lent), les suivantes sont abandonnées
+TRACING_EXPORT_QUEUE = int(os.getenv("TRACING_EXPORT_QUEUE", "1000"))
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "odoo-mcp")
+TRACING_SERVER_TIMING = os.getenv("TRACING_SERVER_TIMING", "true").lower() == "true"
+
+# Étapes httpx/httpcore (extension "trace") -> nom du span
+HTTP_STAGES = {
+    "connection.connect_tcp": "http.connect",
+    "connection.start_tls": "http.tls",
+    "http11.send_request_headers": "http.send",
+    "http11.send_request_body": "http.send",
+    "http11.receive_response_headers": "http.ttfb",
+    "http11.receive_response_body": "http.body",
+    "http2.send_request_headers": "http.send",
+    "http2.send_request_body": "http.send",
+    "http2.receive_response_headers": "http.ttfb",
+    "http2.receive_response_body": "http.body",
+}
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start", "start_ns", "duration", "attributes")
+    
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.duration = 0.0
+        self.attributes = attributes
+    
+    def end(self):
+        self.duration = time.perf_counter() - self.start
+    
+    def to_otlp(self, trace_id: str) -> Dict[str, Any]:
+        span = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + int(self.duration * 1e9)),
+            "attributes": [{"key": key, "value": {"stringValue": str(value)}} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class Trace:
+    """Spans d'une requête ; partagé par toutes les tâches de la requête"""
+    
+    def __init__(self, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.root: Optional[Span] = None
+    
+    def add(self, span: Span):
+        if len(self.spans) < TRACING_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+    
+    def traceparent(self) -> str:
+        span_id = self.root.span_id if self.root else "0" * 16
+        return f"00-{self.trace_id}-{span_id}-{'01' if self.sampled else '00'}"
+    
+    def server_timing(self) -> str:
+        """En-tête Server-Timing : durée cumulée par nom de span, et identifiant de trace"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        entries = [f"{name};dur={duration * 1000:.1f}" for name, duration in totals.items()]
+        entries.append(f'trace;desc="{self.trace_id}"')
+        return ", ".join(entries)
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+
+def _parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_id, sampled) d'un en-tête W3C traceparent valide, sinon None"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+def start_trace(traceparent: Optional[str] = None) -> Optional[Trace]:
+    """Nouvelle trace pour une requête (None si le traçage est désactivé)"""
+    if not TRACING_ENABLED:
+        return None
+    incoming = _parse_traceparent(traceparent)
+    if incoming is not None:
+        trace_id, parent_id, sampled = incoming
+        return Trace(trace_id, parent_id, sampled or random.random() < TRACING_SAMPLE_RATE)
+    return Trace(secrets.token_hex(16), None, random.random() < TRACING_SAMPLE_RATE)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Chronométrer un bloc comme span enfant du span courant
+    
+    Sans trace active, ne fait rien (coût négligeable).
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    
+    current = Span(name, current_span_id.get() or trace.parent_id, attributes)
+    if trace.root is None:
+        trace.root = current
+    token = current_span_id.set(current.span_id)
+    try:
+        yield current
+    finally:
+        current.end()
+        current_span_id.reset(token)
+        trace.add(current)
+
+def http_trace_hook() -> Optional[Callable]:
+    """Callback pour l'extension httpx "trace" : connexion, TLS, envoi, TTFB, corps
+    
+    None sans trace active, pour ne rien ajouter aux requêtes non tracées.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return None
+    parent_id = current_span_id.get()
+    open_spans: Dict[str, Span] = {}
+    
+    async def hook(event: str, info: Dict[str, Any]):
+        stage, _, state = event.rpartition(".")
+        name = HTTP_STAGES.get(stage)
+        if name is None:
+            return
+        if state == "started":
+            open_spans[stage] = Span(name, parent_id, {})
+        elif stage in open_spans:
+            started = open_spans.pop(stage)
+            started.end()
+            if state == "failed":
+                started.attributes["error"] = type(info.get("exception")).__name__
+            trace.add(started)
+    
+    return hook
+
+class FileExporter:
+    """Ajoute chaque trace exportée au fichier, une ligne OTLP/JSON par trace
+    
+    ``export`` ne fait que mettre la trace en file : la mise en forme et
+    l'écriture se font dans un thread dédié, jamais sur la boucle d'événements.
+    """
+    
+    def __init__(self, path: str = TRACING_EXPORT_PATH, max_queue: int = TRACING_EXPORT_QUEUE):
+        self.path = path
+        self.max_queue = max_queue
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+    
+    def _start(self):
+        # Après un fork, le thread d'écriture du parent n'existe pas dans l'enfant
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.max_queue)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="trace-exporter", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+    
+    def export(self, trace: Trace):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _format(self, trace: Trace) -> str:
+        return json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACING_SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp(trace.trace_id) for span in trace.spans],
+                }],
+            }]
+        }, separators=(",", ":"), default=str)
+    
+    def _run(self, pending: queue.Queue):
+        while True:
+            batch = [pending.get()]
+            # Écrire d'un coup les traces arrivées entre-temps
+            while len(batch) < 100:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write("".join(self._format(trace) + "\n" for trace in batch))
+                self.exported += len(batch)
+            except OSError:
+                self.dropped += len(batch)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Attendre l'écriture des traces en file (arrêt du serveur, tests)"""
+        if self._pid != os.getpid() or self._queue is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+exporter = FileExporter()
+
+def finish_trace(trace: Trace):
+    """Exporter la trace si elle est échantillonnée ou lente"""
+    duration = trace.root.duration if trace.root else 0.0
+    if trace.sampled or duration >= TRACING_SLOW_THRESHOLD:
+        exporter.export(trace)
@@ -0,0 +1,198 @@
+"""
+Comptabilisation de l'usage par token API (agrégée en mémoire, écrite par lots)
+"""
+
+import os
+import asyncio
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from loguru import logger
+
+from .database import SessionLocal
+from .models import APIToken, APITokenUsage
+
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "30"))
+
+class RequestUsage:
+    """Compteurs d'une requête en cours"""
+    
+    __slots__ = ("odoo_calls",)
+    
+    def __init__(self):
+        self.odoo_calls = 0
+
+current_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("current_request_usage", default=None)
+
+def count_odoo_call():
+    """Compter un aller-retour HTTP vers Odoo pour la requête en cours"""
+    usage = current_request_usage.get()
+    if usage is not None:
+        usage.odoo_calls += 1
+
+def period_start(when: datetime) -> datetime:
+    """Début de l'heure de ``when`` : période de facturation d'un enregistrement"""
+    return when.replace(minute=0, second=0, microsecond=0)
+
+class _TokenUsage:
+    __slots__ = ("requests", "odoo_calls", "bytes_out", "total_latency_ms", "max_latency_ms", "last_used")
+    
+    def __init__(self):
+        self.requests = 0
+        self.odoo_calls = 0
+        self.bytes_out = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.last_used = None
+    
+    def merge(self, other: "_TokenUsage"):
+        self.requests += other.requests
+        self.odoo_calls += other.odoo_calls
+        self.bytes_out += other.bytes_out
+        self.total_latency_ms += other.total_latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, other.max_latency_ms)
+        self.last_used = max(filter(None, [self.last_used, other.last_used]), default=None)
+
+class UsageAggregator:
+    """Agrège l'usage en mémoire et l'écrit en base toutes les ``interval`` secondes
+    
+    Le chemin chaud ne fait qu'incrémenter des compteurs, par token et par
+    heure d'enregistrement ; l'écriture dans ``api_tokens`` et
+    ``api_token_usage`` se fait en une transaction par lot, hors de la boucle
+    d'événements. Les compteurs sont incrémentés en SQL (``col = col + n``) :
+    plusieurs workers peuvent écrire en même temps sans perdre d'usage.
+    """
+    
+    def __init__(self, interval: float = USAGE_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[Tuple[str, datetime], _TokenUsage] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def record(self, token: str, odoo_calls: int = 0, bytes_out: int = 0, latency_ms: float = 0.0):
+        now = datetime.now(timezone.utc)
+        key = (token, period_start(now))
+        with self._lock:
+            usage = self._pending.get(key)
+            if usage is None:
+                usage = self._pending[key] = _TokenUsage()
+            usage.requests += 1
+            usage.odoo_calls += odoo_calls
+            usage.bytes_out += bytes_out
+            usage.total_latency_ms += latency_ms
+            usage.max_latency_ms = max(usage.max_latency_ms, latency_ms)
+            usage.last_used = now
+    
+    def _take(self) -> Dict[Tuple[str, datetime], _TokenUsage]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+    
+    def _restore(self, snapshot: Dict[Tuple[str, datetime], _TokenUsage]):
+        with self._lock:
+            for key, usage in snapshot.items():
+                if key in self._pending:
+                    usage.merge(self._pending[key])
+                self._pending[key] = usage
+    
+    def _add_period(self, db, api_token: APIToken, period: datetime, usage: _TokenUsage):
+        """Ajouter l'usage d'une période à sa ligne, créée au besoin"""
+        update = {
+            APITokenUsage.requests: APITokenUsage.requests + usage.requests,
+            APITokenUsage.odoo_calls: APITokenUsage.odoo_calls + usage.odoo_calls,
+            APITokenUsage.bytes_out: APITokenUsage.bytes_out + usage.bytes_out,
+            APITokenUsage.total_latency_ms: APITokenUsage.total_latency_ms + usage.total_latency_ms,
+            APITokenUsage.max_latency_ms: case(
+                (APITokenUsage.max_latency_ms < usage.max_latency_ms, usage.max_latency_ms),
+                else_=APITokenUsage.max_latency_ms
+            ),
+        }
+        row = db.query(APITokenUsage).filter(
+            APITokenUsage.api_token_id == api_token.id,
+            APITokenUsage.period_start == period
+        )
+        if row.update(update, synchronize_session=False):
+            return
+        
+        # Première écriture de la période ; si un autre worker vient de créer
+        # la ligne, la contrainte unique échoue et on incrémente la sienne
+        try:
+            with db.begin_nested():
+                db.add(APITokenUsage(
+                    api_token_id=api_token.id,
+                    user_id=api_token.user_id,
+                    period_start=period,
+                    requests=usage.requests,
+                    odoo_calls=usage.odoo_calls,
+                    bytes_out=usage.bytes_out,
+                    total_latency_ms=usage.total_latency_ms,
+                    max_latency_ms=usage.max_latency_ms
+                ))
+        except IntegrityError:
+            row.update(update, synchronize_session=False)
+    
+    def _write(self, snapshot: Dict[Tuple[str, datetime], _TokenUsage]):
+        db = SessionLocal()
+        try:
+            totals: Dict[str, _TokenUsage] = {}
+            for (token, _), usage in snapshot.items():
+                totals.setdefault(token, _TokenUsage()).merge(usage)
+            tokens = {
+                t.token: t for t in db.query(APIToken).filter(APIToken.token.in_(list(totals))).all()
+            }
+            for token, total in totals.items():
+                api_token = tokens.get(token)
+                if api_token is None:
+                    continue
+                # UPDATE direct : pas d'invalidation du cache des tokens
+                db.query(APIToken).filter(APIToken.id == api_token.id).update({
+                    APIToken.usage_count: func.coalesce(APIToken.usage_count, 0) + total.requests,
+                    APIToken.last_used: total.last_used,
+                }, synchronize_session=False)
+            
+            for (token, period), usage in snapshot.items():
+                if token in tokens:
+                    self._add_period(db, tokens[token], period, usage)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    async def flush(self):
+        """Écrire l'usage accumulé ; en cas d'échec il est conservé pour le prochain lot"""
+        snapshot = self._take()
+        if not snapshot:
+            return
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture de l'usage des tokens: {e}")
+            self._restore(snapshot)
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+    
+    def start(self):
+        """Démarrer l'écriture périodique (au démarrage du serveur)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Arrêter l'écriture périodique et écrire le dernier lot"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+usage_aggregator = UsageAggregator()
@@ -1,33 +1,59 @@
 """
 MCP Multi-Tenant Server for Hostinger deployment
 """
-import argparse
-import uvicorn
 import sys
 import os
-from typing import Optional, Dict, Any
+import time
+import asyncio
+from typing import Optional, Dict, Any, AsyncIterator, Tuple, Union
 from mcp.server.fastmcp import FastMCP
 from fastapi import FastAPI, HTTPException, Depends, Request, Header
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import get_db
+from app.core.database import get_async_db, AsyncSessionLocal, dispose_async_engine
 from app.core.models import User, APIToken
-from app.core.odoo_client import OdooClient
-from app.utils.logger import logger
+from app.core.odoo_client import OdooClient, close_http_client, ODOO_STREAM_PAGE_SIZE
+from app.core.token_cache import token_cache, ResolvedTenant
+from app.core.session_pool import session_pool
+from app.core.result_cache import result_cache
+from app.core.schema_registry import schema_registry
+from app.core.scheduler import call_scheduler, SchedulerOverflow
+from app.core.rate_limit import rate_limiter, RateLimitExceeded
+from app.core.usage import usage_aggregator, RequestUsage, current_request_usage
+from app.core.circuit_breaker import endpoint_registry
+from app.core.retry import retry_policy, request_deadline, REQUEST_BUDGET
+from app.core.single_flight import odoo_single_flight
+from app.core.serialization import dumps, dumps_bytes, format_tool_result, resolve_format, to_table
+from app.core.odoo_request import (
+    normalize_request, execute_request, parse_domain, parse_fields,
+    parse_page_size, parse_max_records, parse_cursor, ODOO_MAX_IDS
+)
+from app.core.limits import ODOO_DEFAULT_LIMIT, ODOO_MAX_LIMIT
+from app.core import metrics, tracing
+from app.core.lifecycle import warm_up, drain_odoo_calls
+from app.core.compression import (
+    select_encoding, skip_compression, weak_etag, compress_body, compress_stream, COMPRESSION_MIN_SIZE
+)
+from app.core.context import current_odoo_client
+from app.core.batch import run_batch, BATCH_MAX_SIZE
+from app.core.streaming import (
+    collect_pages, ndjson_stream, sse_event,
+    NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, STREAMING_HEADERS, STREAM_MAX_RECORDS
+)
+from app.utils.logger import logger, redact, request_id, new_request_id, REQUEST_ID_HEADER
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 import secrets
 import string
 
 # Initialize FastMCP server for Odoo tools
 mcp = FastMCP(name="odoo-mcp-proxy", json_response=False, stateless_http=False)
 
-# Global storage for user sessions
-user_sessions: Dict[str, OdooClient] = {}
-
 # Pydantic models
 class OdooConfigRequest(BaseModel):
     odoo_url: str
@@ -39,41 +65,73 @@ def generate_api_token() -> str:
     """Generate a secure API token"""
     return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
 
-def get_odoo_client_from_token(token: str, db: Session) -> OdooClient:
+async def get_odoo_client_from_token(token: str, db: Optional[AsyncSession] = None) -> OdooClient:
     """Get Odoo client from API token"""
-    # Get user by token
-    api_token = db.query(APIToken).filter(
-        APIToken.token == token,
-        APIToken.is_active == True
-    ).first()
+    return (await resolve_token(token, db))[1]
+
+async def resolve_token(token: str, db: Optional[AsyncSession] = None) -> Tuple[str, OdooClient]:
+    """Resolve an API token to its tenant: ``(user_id, odoo_client)``
     
-    if not api_token:
-        raise HTTPException(status_code=401, detail="Token API invalide")
+    Resolutions are cached in ``token_cache`` and clients live in
+    ``session_pool``: in steady state this does no database round-trip.
+    On a miss the lookup runs on an async session (opened when none is
+    provided), so it does not block the event loop.
+    """
+    started = time.perf_counter()
+    cached = token_cache.get(token)
+    if cached is not None:
+        odoo_client = session_pool.get(cached.user_id)
+        if odoo_client is not None:
+            metrics.token_lookup_duration.observe(time.perf_counter() - started, "cache")
+            return cached.user_id, odoo_client
     
-    user = db.query(User).filter(User.user_id == api_token.user_id).first()
+    try:
+        with tracing.span("token.db_lookup"):
+            if db is not None:
+                return await db.run_sync(_load_tenant, token, cached)
+            async with AsyncSessionLocal() as db:
+                return await db.run_sync(_load_tenant, token, cached)
+    finally:
+        metrics.token_lookup_duration.observe(time.perf_counter() - started, "db")
+
+def _load_tenant(db: Session, token: str, cached: Optional[ResolvedTenant]) -> Tuple[str, OdooClient]:
+    """Database part of ``resolve_token``: check the token and user, refresh the caches"""
+    if cached is not None:
+        user_id = cached.user_id
+    else:
+        # Get user by token
+        api_token = db.query(APIToken).filter(
+            APIToken.token == token,
+            APIToken.is_active == True
+        ).first()
+        
+        if not api_token:
+            raise HTTPException(status_code=401, detail="Token API invalide")
+        user_id = api_token.user_id
+    
+    user = db.query(User).filter(User.user_id == user_id).first()
     if not user or not user.is_active:
+        token_cache.invalidate_token(token)
         raise HTTPException(status_code=401, detail="Utilisateur non trouvé ou inactif")
     
-    # Create or get cached Odoo client
-    if token not in user_sessions:
-        user_sessions[token] = OdooClient(
-            user.odoo_url,
-            user.odoo_db,
-            user.odoo_username,
-            user.odoo_password
-        )
+    if cached is None:
+        token_cache.set(token, ResolvedTenant(token, user.user_id))
     
-    return user_sessions[token]
+    # One authenticated client per tenant, shared by all its tokens
+    return user.user_id, session_pool.acquire(user)
 
 @mcp.tool()
 async def execute_odoo_method(
     model: str,
     method: str,
-    domain: Optional[str] = None,
-    fields: Optional[str] = None,
+    domain: Optional[Union[str, list]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
     limit: Optional[int] = None,
-    ids: Optional[str] = None,
-    values: Optional[str] = None
+    ids: Optional[Union[str, List[int]]] = None,
+    values: Optional[Union[str, dict, list]] = None,
+    offset: Optional[int] = None,
+    format: Optional[str] = None,
+    pretty: Optional[bool] = None
 ) -> str:
     """🚀 UNIVERSAL ODOO TOOL - Execute any Odoo method on any model.
     
@@ -88,108 +146,153 @@ async def execute_odoo_method(
     Args:
         model: Odoo model name (e.g., 'res.partner', 'product.product', 'sale.order')
         method: Method to execute ('search_read', 'search', 'read', 'create', 'write', 'unlink')
-        domain: Search domain as JSON string (for search/search_read). Ex: "[[\"is_company\", \"=\", true]]"
-        fields: Comma-separated fields to return (for search_read/read). Ex: "name,email,phone"
-        limit: Max number of records (for search/search_read). Default: 10
-        ids: Comma-separated IDs (for read/write/unlink). Ex: "1,2,3"
-        values: Values as JSON string (for create/write). Ex: "{\"name\": \"John\", \"email\": \"john@example.com\"}"
+        domain: Search domain as JSON array or string (for search/search_read). Ex: [["is_company", "=", true]]
+        fields: Fields to return, as a list or comma-separated string (for search_read/read). Ex: "name,email,phone". Default: all stored fields except binary, html and one2many ones (plus display_name)
+        limit: Max number of records (for search/search_read). Default: 10, capped per tenant and model
+        offset: Number of records to skip (for search/search_read). Use `next_offset` from the previous page
+        ids: IDs as a list or comma-separated string (for read/write/unlink). Ex: "1,2,3"
+        values: Values as JSON object or string (for create/write). Ex: {"name": "John", "email": "john@example.com"}
+        format: 'json' (list of records) or 'table' (columns + rows, for search_read/read). Default: json
+        pretty: Indent the JSON output. Default: compact
     """
+    return await run_odoo_method(
+        current_odoo_client.get(),
+        model=model,
+        method=method,
+        domain=domain,
+        fields=fields,
+        limit=limit,
+        ids=ids,
+        values=values,
+        offset=offset,
+        format=format,
+        pretty=pretty
+    )
+
+async def run_odoo_method(
+    odoo_client: Optional[OdooClient],
+    model: str,
+    method: str,
+    domain: Optional[Union[str, list]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    limit: Optional[int] = None,
+    ids: Optional[Union[str, List[int]]] = None,
+    values: Optional[Union[str, dict, list]] = None,
+    offset: Optional[int] = None,
+    format: Optional[str] = None,
+    pretty: Optional[bool] = None
+) -> str:
+    """Run the universal tool against an explicit tenant client"""
     try:
-        import json
-        
-        odoo_client = getattr(execute_odoo_method, '_odoo_client', None)
         if not odoo_client:
             return "Erreur: Client Odoo non configuré"
         
-        logger.info(f"Executing Odoo method: {model}.{method}")
+        logger.bind(sampled=True).info("Executing Odoo method {model}.{method}", model=model, method=method)
         
-        # Build arguments based on method
-        args = []
-        kwargs = {}
+        try:
+            with tracing.span("args.normalize"):
+                format = resolve_format(format)
+                odoo_request = normalize_request(model, method, domain, fields, limit, ids, values, offset, odoo_client.host)
+        except ValueError as e:
+            return f"Erreur: {str(e)}"
         
-        if method in ['search', 'search_read']:
-            # Parse domain
-            if domain:
-                try:
-                    parsed_domain = json.loads(domain)
-                    args.append(parsed_domain)
-                except:
-                    args.append([])
-            else:
-                args.append([])
-            
-            # Add kwargs
-            if fields:
-                kwargs['fields'] = [f.strip() for f in fields.split(',')]
-            if limit:
-                kwargs['limit'] = limit
-            elif limit is None:
-                kwargs['limit'] = 10  # Default limit
-                
-        elif method == 'read':
-            # Parse IDs
-            if ids:
-                id_list = [int(i.strip()) for i in ids.split(',')]
-                args.append(id_list)
-            else:
-                return "Erreur: 'ids' requis pour la méthode 'read'"
-            
-            if fields:
-                kwargs['fields'] = [f.strip() for f in fields.split(',')]
-                
-        elif method == 'create':
-            # Parse values
-            if values:
-                try:
-                    parsed_values = json.loads(values)
-                    args.append([parsed_values])
-                except Exception as e:
-                    return f"Erreur lors du parsing de 'values': {str(e)}"
-            else:
-                return "Erreur: 'values' requis pour la méthode 'create'"
-                
-        elif method == 'write':
-            # Parse IDs and values
-            if not ids:
-                return "Erreur: 'ids' requis pour la méthode 'write'"
-            if not values:
-                return "Erreur: 'values' requis pour la méthode 'write'"
-            
-            try:
-                id_list = [int(i.strip()) for i in ids.split(',')]
-                parsed_values = json.loads(values)
-                args.append(id_list)
-                args.append(parsed_values)
-            except Exception as e:
-                return f"Erreur lors du parsing: {str(e)}"
-                
-        elif method == 'unlink':
-            # Parse IDs
-            if ids:
-                id_list = [int(i.strip()) for i in ids.split(',')]
-                args.append(id_list)
-            else:
-                return "Erreur: 'ids' requis pour la méthode 'unlink'"
-        
-        # Execute the method
-        result = odoo_client.execute_method(
-            model=model,
-            method=method,
-            args=args,
-            kwargs=kwargs
-        )
+        # Validate requested fields locally and execute (large reads are chunked)
+        try:
+            result = await execute_request(odoo_client, odoo_request, entry="mcp")
+        except ValueError as e:
+            return f"Erreur: {str(e)}"
         
         # Check for error
         if isinstance(result, dict) and 'error' in result:
             return f"Erreur Odoo: {result['error']}"
         
-        # Format result
-        return json.dumps(result, indent=2, ensure_ascii=False, default=str)
-        
+        # Format result (compact JSON unless pretty, optionally tabular)
+        with tracing.span("serialize"):
+            return format_tool_result(result, method, format, pretty)
+    
+    except SchedulerOverflow:
+        raise
     except Exception as e:
         logger.error(f"Error executing Odoo method: {str(e)}")
         return f"Erreur: {str(e)}"
 
+async def open_record_stream(
+    odoo_client: OdooClient,
+    model: str,
+    domain: Optional[Union[str, list]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[int] = None
+):
+    """Parse streaming arguments and return the page iterator
+    
+    A malformed domain is an error: silently falling back to ``[]`` would
+    stream the whole table. ``page_size`` is capped at the model's search limit.
+    """
+    parsed_domain = parse_domain(domain)
+    page_size = parse_page_size(page_size, model, odoo_client.host)
+    cursor = parse_cursor(cursor)
+    field_list = await schema_registry.resolve_fields(odoo_client, model, parse_fields(fields))
+    return odoo_client.iter_search_read(model, parsed_domain, field_list, page_size, cursor)
+
+async def run_stream_search_read(
+    odoo_client: Optional[OdooClient],
+    model: str,
+    domain: Optional[Union[str, list]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[int] = None,
+    max_records: Optional[int] = None,
+    format: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Page through a search_read, yielding progress then the final tool text"""
+    if not odoo_client:
+        yield {"text": "Erreur: Client Odoo non configuré"}
+        return
+    try:
+        tabular = resolve_format(format) == "table"
+        max_records = parse_max_records(max_records)
+        pages = await open_record_stream(odoo_client, model, domain, fields, page_size, cursor)
+    except SchedulerOverflow as e:
+        yield {"text": f"Erreur: {str(e)}"}
+        return
+    except Exception as e:
+        yield {"text": f"Erreur lors du parsing: {str(e)}"}
+        return
+    
+    async for event in collect_pages(pages, max_records, cursor):
+        if "progress" in event:
+            yield event
+        elif "error" in event:
+            yield {"text": f"Erreur Odoo: {event['error']} (next_cursor: {event['next_cursor']})"}
+        else:
+            if tabular:
+                event = {**event, "records": to_table(event["records"])}
+            yield {"text": dumps(event)}
+
+@mcp.tool()
+async def stream_search_read(
+    model: str,
+    domain: Optional[Union[str, list]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[int] = None,
+    max_records: Optional[int] = None,
+    format: Optional[str] = None
+) -> str:
+    """Read a large result set page by page (by increasing ID).
+    
+    Returns at most `max_records` records and a `next_cursor`: call again
+    with `cursor=next_cursor` to continue, until `next_cursor` is null.
+    `format='table'` returns records as columns + rows.
+    """
+    text = ""
+    async for event in run_stream_search_read(
+        current_odoo_client.get(), model, domain, fields, page_size, cursor, max_records, format
+    ):
+        text = event.get("text", text)
+    return text
+
 # Create FastAPI app with MCP integration
 app = FastAPI(title="Odoo MCP Multi-Tenant Server")
 
@@ -198,9 +301,49 @@ from fastapi.staticfiles import StaticFiles
 # Mount static files
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
+@app.on_event("startup")
+async def start_usage_flush():
+    """Start the periodic write of per-token usage"""
+    usage_aggregator.start()
+
+@app.on_event("startup")
+async def warm_pools():
+    """Open the DB engine and connections to the recently used Odoo hosts"""
+    await warm_up()
+
+@app.on_event("shutdown")
+async def drain_calls():
+    """Let in-flight Odoo calls finish (including shared ones) before closing the pools"""
+    await drain_odoo_calls()
+
+@app.on_event("shutdown")
+async def flush_usage():
+    """Write the last usage batch before exiting"""
+    await usage_aggregator.stop()
+
+@app.on_event("shutdown")
+async def flush_traces():
+    """Write the traces still queued for export"""
+    await asyncio.to_thread(tracing.exporter.flush)
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    """Close the shared Odoo HTTP connection pool"""
+    await close_http_client()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    """Close the async database engine's connections"""
+    await dispose_async_engine()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    """Wait for queued log entries to be written"""
+    await logger.complete()
+
 @app.middleware("http")
 async def mcp_auth_middleware(request: Request, call_next):
-    """Middleware to authenticate MCP requests and set Odoo client"""
+    """Middleware to authenticate MCP requests and bind the request's Odoo client"""
     
     # Only apply to MCP POST endpoints (not GET)
     if request.url.path.startswith("/mcp") and request.method == "POST":
@@ -215,27 +358,222 @@ async def mcp_auth_middleware(request: Request, call_next):
         
         token = auth_header.split(" ", 1)[1]
         
-        # Get database session
-        db = next(get_db())
         try:
-            # Get Odoo client
-            odoo_client = get_odoo_client_from_token(token, db)
-            
-            # Set Odoo client for the universal tool
-            execute_odoo_method._odoo_client = odoo_client
+            # Get Odoo client (cached, no DB session unless the token is unknown)
+            with tracing.span("mcp.auth"):
+                user_id, odoo_client = await resolve_token(token)
             
+            # Share the resolution with the MCP handlers
+            request.state.odoo_client = odoo_client
+            request.state.user_id = user_id
+        
         except Exception as e:
             from fastapi.responses import JSONResponse
             return JSONResponse(
                 status_code=401, 
                 content={"error": str(e)}
             )
+        
+        try:
+            with tracing.span("rate_limit"):
+                await rate_limiter.check_request(token, user_id)
+        except RateLimitExceeded as e:
+            from fastapi.responses import JSONResponse
+            return JSONResponse(
+                status_code=429,
+                content={"error": str(e)},
+                headers={"Retry-After": str(int(e.retry_after))}
+            )
+        
+        # Bind the tenant to this request's context only
+        context_token = current_odoo_client.set(odoo_client)
+        try:
+            return await call_next(request)
+        finally:
+            current_odoo_client.reset(context_token)
+    
+    response = await call_next(request)
+    return response
+
+@app.middleware("http")
+async def compression_middleware(request: Request, call_next):
+    """Compress responses with the encoding negotiated from Accept-Encoding
+    
+    Complete responses under COMPRESSION_MIN_SIZE are sent as is. Streamed
+    responses (NDJSON, SSE) are compressed chunk by chunk with a flush after
+    each one, so every event reaches the client immediately. Partial (206)
+    responses are left as is, and a compressed response gets a weak ETag.
+    """
+    response = await call_next(request)
+    if skip_compression(request.method, response.status_code, response.headers):
+        return response
+    
+    content_length = response.headers.get("content-length")
+    streaming = content_length is None
+    encoding = select_encoding(
+        request.url.path,
+        request.headers.get("accept-encoding", ""),
+        response.headers.get("content-type", ""),
+        streaming
+    )
+    if encoding is None or (not streaming and int(content_length) < COMPRESSION_MIN_SIZE):
+        return response
+    
+    if streaming:
+        response.body_iterator = compress_stream(response.body_iterator, encoding)
+    else:
+        body = compress_body(b"".join([chunk async for chunk in response.body_iterator]), encoding)
+        
+        async def compressed_body():
+            yield body
+        
+        response.body_iterator = compressed_body()
+        response.headers["content-length"] = str(len(body))
+    response.headers["content-encoding"] = encoding
+    if "etag" in response.headers:
+        response.headers["etag"] = weak_etag(response.headers["etag"])
+    response.headers.add_vary_header("Accept-Encoding")
+    return response
+
+# Authenticated API paths whose usage is accounted per token
+USAGE_TRACKED_PREFIXES = ("/mcp", "/api/odoo/")
+
+@app.middleware("http")
+async def usage_middleware(request: Request, call_next):
+    """Account requests, Odoo round-trips, bytes and latency per API token"""
+    auth_header = request.headers.get("authorization")
+    if not request.url.path.startswith(USAGE_TRACKED_PREFIXES) or not auth_header or not auth_header.startswith("Bearer "):
+        return await call_next(request)
+    
+    token = auth_header.split(" ", 1)[1]
+    usage = RequestUsage()
+    context_token = current_request_usage.set(usage)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_request_usage.reset(context_token)
+    
+    # Rejected calls are not billed
+    if response.status_code in (401, 429):
+        return response
+    
+    body_iterator = response.body_iterator
+    
+    async def counted_body():
+        # Recorded once the body is sent, so streamed responses count fully
+        bytes_out = 0
+        try:
+            async for chunk in body_iterator:
+                bytes_out += len(chunk)
+                yield chunk
         finally:
-            db.close()
+            usage_aggregator.record(token, usage.odoo_calls, bytes_out, (time.perf_counter() - started) * 1000)
+    
+    response.body_iterator = counted_body()
+    return response
+
+@app.middleware("http")
+async def request_budget_middleware(request: Request, call_next):
+    """Bound Odoo retries by the request's overall time budget"""
+    if not request.url.path.startswith(USAGE_TRACKED_PREFIXES):
+        return await call_next(request)
+    
+    context_token = request_deadline.set(time.monotonic() + REQUEST_BUDGET)
+    try:
+        return await call_next(request)
+    finally:
+        request_deadline.reset(context_token)
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Count requests and record latency and payload sizes per entry point"""
+    if not metrics.METRICS_ENABLED or not request.url.path.startswith(USAGE_TRACKED_PREFIXES):
+        return await call_next(request)
+    
+    entry = request.url.path.rstrip("/") or "/"
+    started = time.perf_counter()
+    request_size = request.headers.get("content-length")
+    if request_size is not None:
+        metrics.http_request_size.observe(int(request_size), entry)
     
     response = await call_next(request)
+    metrics.http_requests.inc(entry, str(response.status_code))
+    response_size = response.headers.get("content-length")
+    if response_size is not None:
+        metrics.http_response_size.observe(int(response_size), entry)
+        metrics.http_duration.observe(time.perf_counter() - started, entry)
+        return response
+    
+    # Streamed body: size and duration are known once it has been sent
+    body_iterator = response.body_iterator
+    
+    async def measured_body():
+        sent = 0
+        try:
+            async for chunk in body_iterator:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            metrics.http_response_size.observe(sent, entry)
+            metrics.http_duration.observe(time.perf_counter() - started, entry)
+    
+    response.body_iterator = measured_body()
     return response
 
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    """Trace the request (when TRACING_ENABLED) and report span timings in Server-Timing
+    
+    An incoming W3C ``traceparent`` is continued; the response carries the
+    trace ID in both ``traceparent`` and ``Server-Timing``.
+    """
+    if not request.url.path.startswith(USAGE_TRACKED_PREFIXES):
+        return await call_next(request)
+    trace = tracing.start_trace(request.headers.get("traceparent"))
+    if trace is None:
+        return await call_next(request)
+    
+    context_token = tracing.current_trace.set(trace)
+    try:
+        with tracing.span("http.request", path=request.url.path, method=request.method) as root:
+            response = await call_next(request)
+            root.attributes["status"] = response.status_code
+    finally:
+        tracing.current_trace.reset(context_token)
+    
+    if tracing.TRACING_SERVER_TIMING:
+        response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["traceparent"] = trace.traceparent()
+    if "content-length" in response.headers:
+        tracing.finish_trace(trace)
+        return response
+    
+    # Streamed body: the root span lasts until the body has been sent
+    body_iterator = response.body_iterator
+    
+    async def traced_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            root.end()
+            tracing.finish_trace(trace)
+    
+    response.body_iterator = traced_body()
+    return response
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Tag every log entry of the request with a correlation ID, echoed in X-Request-ID"""
+    token = request_id.set(new_request_id(request.headers.get(REQUEST_ID_HEADER)))
+    try:
+        response = await call_next(request)
+        response.headers[REQUEST_ID_HEADER] = request_id.get()
+        return response
+    finally:
+        request_id.reset(token)
+
 # MCP Streamable HTTP endpoints
 @app.get("/mcp")
 async def mcp_get_endpoint(request: Request):
@@ -260,6 +598,13 @@ async def mcp_get_endpoint(request: Request):
         }
     }
 
+class MCPJSONResponse(JSONResponse):
+    """Compact JSON-RPC response body (orjson when installed)"""
+    
+    def render(self, content: Any) -> bytes:
+        with tracing.span("serialize"):
+            return dumps_bytes(content)
+
 @app.post("/mcp")
 async def mcp_endpoint_no_slash(request: Request):
     """Handle MCP Streamable HTTP requests without trailing slash"""
@@ -267,14 +612,101 @@ async def mcp_endpoint_no_slash(request: Request):
 
 @app.post("/mcp/")
 async def mcp_endpoint_with_slash(request: Request):
-    """Handle MCP Streamable HTTP requests"""
+    """Handle MCP Streamable HTTP requests (single message or JSON-RPC batch)"""
     try:
         body = await request.json()
+    except Exception as e:
+        logger.error(f"MCP endpoint error: {str(e)}")
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32700, "message": f"Parse error: {str(e)}"}
+        }
+    
+    if isinstance(body, list):
+        response = await handle_mcp_batch(body, request)
+    else:
+        response = await handle_mcp_message(body, request)
+    if isinstance(response, (dict, list)):
+        # Encoded once, without FastAPI's jsonable_encoder pass over the payload
+        return MCPJSONResponse(response)
+    return response
+
+async def handle_mcp_batch(messages: list, request: Request):
+    """Handle a JSON-RPC 2.0 batch: messages run concurrently, responses keep request order"""
+    if not messages or len(messages) > BATCH_MAX_SIZE:
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32600, "message": f"Invalid Request: batch must contain 1 to {BATCH_MAX_SIZE} messages"}
+        }
+    
+    odoo_client = getattr(request.state, "odoo_client", None)
+    responses = await run_batch(
+        odoo_client,
+        [lambda message=message: handle_mcp_message(message, request, allow_stream=False) for message in messages]
+    )
+    
+    # Notifications (no id) get no response
+    responses = [
+        response for message, response in zip(messages, responses)
+        if not (isinstance(message, dict) and "id" not in message)
+    ]
+    if not responses:
+        from fastapi.responses import Response
+        return Response(status_code=202)
+    return responses
+
+async def mcp_progress_stream(events, request_id, progress_token) -> AsyncIterator[bytes]:
+    """SSE body for a streamed tool call: progress notifications, then the JSON-RPC response"""
+    async for event in events:
+        if "progress" in event:
+            if progress_token is not None:
+                yield sse_event({
+                    "jsonrpc": "2.0",
+                    "method": "notifications/progress",
+                    "params": {"progressToken": progress_token, "progress": event["progress"]}
+                })
+            else:
+                # Keep the connection alive behind nginx
+                yield b": progress\n\n"
+        else:
+            yield sse_event({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": {"content": [{"type": "text", "text": event["text"]}]}
+            })
+
+# JSON-RPC methods handled below (others are counted as "other" in metrics)
+MCP_METHODS = ("initialize", "tools/list", "tools/call")
+
+async def handle_mcp_message(body: Any, request: Request, allow_stream: bool = True):
+    """Handle a single MCP JSON-RPC message
+    
+    With ``allow_stream`` (not in batches), streamed tools answer with SSE
+    when the client accepts ``text/event-stream``.
+    """
+    if not isinstance(body, dict):
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32600, "message": "Invalid Request"}
+        }
+    
+    try:
         method = body.get("method")
         params = body.get("params", {})
         request_id = body.get("id")
         
-        logger.info(f"MCP request: {method} with params: {params}")
+        # Method and argument names only: payloads (create/write values) stay out of the logs
+        arguments = params.get("arguments") if isinstance(params, dict) else None
+        logger.bind(sampled=True).info(
+            "MCP request {mcp_method}",
+            mcp_method=method,
+            tool=params.get("name") if isinstance(params, dict) else None,
+            arguments=sorted(arguments) if isinstance(arguments, dict) else None
+        )
+        metrics.mcp_messages.inc(method if method in MCP_METHODS else "other")
         
         if method == "initialize":
             # MCP handshake - required by OpenAI
@@ -311,28 +743,83 @@ async def mcp_endpoint_with_slash(request: Request):
                                 "description": "Method to execute (e.g., 'search_read', 'search', 'read', 'create', 'write', 'unlink')"
                             },
                             "domain": {
-                                "type": "string",
-                                "description": "Search domain as JSON string. Example: \"[[\\\"is_company\\\", \\\"=\\\", true]]\" or \"[]\" for all records"
+                                "type": ["array", "string"],
+                                "description": "Search domain as JSON array (or JSON string). Example: \"[[\\\"is_company\\\", \\\"=\\\", true]]\" or \"[]\" for all records"
                             },
                             "fields": {
-                                "type": "string",
-                                "description": "Comma-separated list of fields to return. Example: \"name,email,phone\" or leave empty for all fields"
+                                "type": ["array", "string"],
+                                "description": "Fields to return, as an array or a comma-separated string. Example: \"name,email,phone\". Leave empty for all stored fields except binary, html and one2many ones (one2many fields must be requested explicitly)"
                             },
                             "limit": {
                                 "type": "integer",
-                                "description": "Maximum number of records to return. Default: 10"
+                                "description": f"Maximum number of records to return (capped at {ODOO_MAX_LIMIT}, or lower for some models). Default: {ODOO_DEFAULT_LIMIT}"
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "Number of records to skip. Search results include total_count and next_offset: pass next_offset to get the next page (null on the last page)"
                             },
                             "ids": {
-                                "type": "string",
-                                "description": "Comma-separated list of record IDs for read/write/unlink. Example: \"1,2,3\""
+                                "type": ["array", "string"],
+                                "description": f"Record IDs for read/write/unlink, as an array or a comma-separated string (at most {ODOO_MAX_IDS}). Example: [1, 2, 3]"
                             },
                             "values": {
+                                "type": ["object", "array", "string"],
+                                "description": "Values to create/write as a JSON object (or JSON string; a list of objects creates several records). Example: \"{\\\"name\\\": \\\"John\\\", \\\"email\\\": \\\"john@example.com\\\"}\""
+                            },
+                            "format": {
                                 "type": "string",
-                                "description": "Values to create/write as JSON string. Example: \"{\\\"name\\\": \\\"John\\\", \\\"email\\\": \\\"john@example.com\\\"}\""
+                                "enum": ["json", "table"],
+                                "description": "Result layout: 'json' (list of records) or 'table' (columns + rows, fewer tokens for search_read/read). Default: json"
+                            },
+                            "pretty": {
+                                "type": "boolean",
+                                "description": "Indent the JSON result. Default: compact"
                             }
                         },
                         "required": ["model", "method"]
                     }
+                },
+                {
+                    "name": "stream_search_read",
+                    "description": "Read a large result set page by page (by increasing record ID). Returns at most max_records records and a next_cursor: call again with cursor=next_cursor until next_cursor is null. Sends progress notifications when the client accepts text/event-stream.",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "model": {
+                                "type": "string",
+                                "description": "Odoo model name (e.g., 'account.move.line')"
+                            },
+                            "domain": {
+                                "type": ["array", "string"],
+                                "description": "Search domain as JSON array (or JSON string). Example: \"[[\\\"parent_state\\\", \\\"=\\\", \\\"posted\\\"]]\""
+                            },
+                            "fields": {
+                                "type": ["array", "string"],
+                                "description": "Fields to return, as an array or a comma-separated string"
+                            },
+                            "page_size": {
+                                "type": "integer",
+                                "description": f"Records fetched per Odoo call (capped at {ODOO_MAX_LIMIT}, or lower for some models). Default: {ODOO_STREAM_PAGE_SIZE}",
+                                "minimum": 1
+                            },
+                            "cursor": {
+                                "type": "integer",
+                                "description": "Resume after this record ID (next_cursor of the previous call)",
+                                "minimum": 0
+                            },
+                            "max_records": {
+                                "type": "integer",
+                                "description": f"Maximum records returned by this call (at most {STREAM_MAX_RECORDS}). Default: {STREAM_MAX_RECORDS}",
+                                "minimum": 1
+                            },
+                            "format": {
+                                "type": "string",
+                                "enum": ["json", "table"],
+                                "description": "Records layout: 'json' (list of records) or 'table' (columns + rows). Default: json"
+                            }
+                        },
+                        "required": ["model"]
+                    }
                 }
             ]
             
@@ -341,7 +828,7 @@ async def mcp_endpoint_with_slash(request: Request):
                 "id": request_id,
                 "result": {"tools": tools}
             }
-            
+        
         elif method == "tools/call":
             # Handle tool calls
             tool_name = params.get("name")
@@ -357,25 +844,52 @@ async def mcp_endpoint_with_slash(request: Request):
                 }
             
             token = auth_header.split(" ", 1)[1]
-            db = next(get_db())
             
             try:
-                odoo_client = get_odoo_client_from_token(token, db)
+                # Reuse the resolution done by mcp_auth_middleware
+                odoo_client = getattr(request.state, "odoo_client", None)
+                user_id = getattr(request.state, "user_id", None)
+                if odoo_client is None:
+                    user_id, odoo_client = await resolve_token(token)
                 
-                # Set Odoo client for the universal tool
-                setattr(execute_odoo_method, '_odoo_client', odoo_client)
+                await rate_limiter.check_odoo_calls(token, user_id)
                 
-                # Call the universal tool
+                # Call the universal tool with this request's tenant
                 if tool_name == "execute_odoo_method":
-                    result = await execute_odoo_method(
+                    result = await run_odoo_method(
+                        odoo_client,
                         model=arguments.get("model"),
                         method=arguments.get("method"),
                         domain=arguments.get("domain"),
                         fields=arguments.get("fields"),
                         limit=arguments.get("limit"),
                         ids=arguments.get("ids"),
-                        values=arguments.get("values")
+                        values=arguments.get("values"),
+                        offset=arguments.get("offset"),
+                        format=arguments.get("format"),
+                        pretty=arguments.get("pretty")
                     )
+                elif tool_name == "stream_search_read":
+                    events = run_stream_search_read(
+                        odoo_client,
+                        model=arguments.get("model"),
+                        domain=arguments.get("domain"),
+                        fields=arguments.get("fields"),
+                        page_size=arguments.get("page_size"),
+                        cursor=arguments.get("cursor"),
+                        max_records=arguments.get("max_records"),
+                        format=arguments.get("format")
+                    )
+                    if allow_stream and SSE_MEDIA_TYPE in request.headers.get("accept", ""):
+                        progress_token = (params.get("_meta") or {}).get("progressToken")
+                        return StreamingResponse(
+                            mcp_progress_stream(events, request_id, progress_token),
+                            media_type=SSE_MEDIA_TYPE,
+                            headers=STREAMING_HEADERS
+                        )
+                    result = ""
+                    async for event in events:
+                        result = event.get("text", result)
                 else:
                     return {
                         "jsonrpc": "2.0",
@@ -388,7 +902,17 @@ async def mcp_endpoint_with_slash(request: Request):
                     "id": request_id,
                     "result": {"content": [{"type": "text", "text": result}]}
                 }
-                
+            
+            except (SchedulerOverflow, RateLimitExceeded) as e:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {
+                        "code": -32001,
+                        "message": f"Too many requests: {str(e)}",
+                        "data": {"retry_after": e.retry_after}
+                    }
+                }
             except Exception as e:
                 logger.error(f"Error calling tool {tool_name}: {str(e)}")
                 return {
@@ -396,16 +920,14 @@ async def mcp_endpoint_with_slash(request: Request):
                     "id": request_id,
                     "error": {"code": -32603, "message": f"Internal error: {str(e)}"}
                 }
-            finally:
-                db.close()
-                
+        
         else:
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
                 "error": {"code": -32601, "message": f"Unknown method: {method}"}
             }
-            
+    
     except Exception as e:
         logger.error(f"MCP endpoint error: {str(e)}")
         return {
@@ -428,7 +950,60 @@ async def read_test():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "mcp_endpoint": "/mcp"}
+    return {
+        "status": "healthy",
+        "mcp_endpoint": "/mcp",
+        "worker": os.getpid(),
+        "sessions": session_pool.stats(),
+        "result_cache": result_cache.stats(),
+        "scheduler": call_scheduler.stats(),
+        "rate_limited": rate_limiter.rejected,
+        "odoo_endpoints": endpoint_registry.summary(),
+        "odoo_retries": retry_policy.retries,
+        "odoo_coalesced": odoo_single_flight.shared
+    }
+
+def is_local_request(request: Request) -> bool:
+    """Request made from the server itself, not relayed by a reverse proxy"""
+    client_host = request.client.host if request.client else ""
+    return client_host in ("127.0.0.1", "::1", "localhost") and "x-forwarded-for" not in request.headers
+
+@app.get("/metrics")
+async def metrics_endpoint(request: Request, authorization: str = Header(None)):
+    """Prometheus metrics
+    
+    Requires METRICS_TOKEN when set. Without it, only direct local requests are
+    served: anything coming through a proxy (X-Forwarded-For) gets a 404.
+    """
+    from fastapi.responses import PlainTextResponse
+    if metrics.METRICS_TOKEN:
+        if not secrets.compare_digest(authorization or "", f"Bearer {metrics.METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Token metrics invalide")
+    elif not is_local_request(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def runtime_gauges():
+    """Gauges derived from the existing component statistics, read at scrape time"""
+    cache = result_cache.stats()
+    scheduler = call_scheduler.stats()
+    endpoints = endpoint_registry.summary()["states"]
+    return [
+        ("odoo_mcp_session_pool_size", "Authenticated Odoo clients in the session pool", session_pool.stats()["size"]),
+        ("odoo_mcp_result_cache_entries", "Entries in the Odoo result cache", cache["entries"]),
+        ("odoo_mcp_result_cache_bytes", "Approximate size of the Odoo result cache", cache["bytes"]),
+        ("odoo_mcp_result_cache_hits", "Odoo result cache hits since start", cache["hits"]),
+        ("odoo_mcp_scheduler_inflight", "Odoo calls in flight", scheduler["inflight"]),
+        ("odoo_mcp_scheduler_queued", "Odoo calls waiting for a slot", scheduler["queued"]),
+        ("odoo_mcp_scheduler_rejected", "Odoo calls rejected by the scheduler since start", scheduler["rejected"]),
+        ("odoo_mcp_breakers_open", "Odoo hosts with an open or half-open circuit breaker", endpoints["open"] + endpoints["half_open"]),
+        ("odoo_mcp_rate_limited", "Requests rejected by the rate limiter since start", rate_limiter.rejected),
+        ("odoo_mcp_odoo_retries", "Odoo calls retried after a transient error since start", retry_policy.retries),
+        ("odoo_mcp_odoo_coalesced", "Odoo reads served by an identical in-flight call since start", odoo_single_flight.shared),
+        ("odoo_mcp_traces_dropped", "Traces dropped because the export queue was full since start", tracing.exporter.dropped),
+    ]
+
+metrics.registry.register_collector(runtime_gauges)
 
 @app.get("/sitemap.xml")
 async def sitemap():
@@ -447,16 +1022,17 @@ async def mcp_debug(request: Request):
     """Debug endpoint to see what OpenAI sends"""
     try:
         body = await request.json()
-        headers = dict(request.headers)
+        # Credentials never leave the process, not even back to the caller
+        headers = redact(dict(request.headers))
+        body = redact(body)
         
-        logger.info(f"DEBUG - Headers: {headers}")
-        logger.info(f"DEBUG - Body: {body}")
+        logger.info("MCP debug request", headers=headers, body=body)
         
         return {
             "debug": True,
             "headers": headers,
             "body": body,
-            "auth_header": headers.get("authorization", "MISSING")
+            "auth_header": "present" if "authorization" in request.headers else "MISSING"
         }
     except Exception as e:
         logger.error(f"DEBUG error: {str(e)}")
@@ -464,7 +1040,7 @@ async def mcp_debug(request: Request):
 
 # API endpoints for frontend
 @app.post("/api/config")
-async def configure_odoo(config: OdooConfigRequest, db: Session = Depends(get_db)):
+async def configure_odoo(config: OdooConfigRequest, db: AsyncSession = Depends(get_async_db)):
     """Configure a new Odoo instance and generate API token"""
     
     try:
@@ -472,7 +1048,7 @@ async def configure_odoo(config: OdooConfigRequest, db: Session = Depends(get_db
         
         # Test Odoo connection
         client = OdooClient(config.odoo_url, config.odoo_db, config.odoo_username, config.odoo_password)
-        if not client.test_connection():
+        if not await client.test_connection():
             raise HTTPException(status_code=400, detail="Impossible de se connecter à Odoo. Vérifiez vos identifiants.")
         
         # Generate API token
@@ -487,7 +1063,7 @@ async def configure_odoo(config: OdooConfigRequest, db: Session = Depends(get_db
         )
         
         db.add(user)
-        db.flush()  # To get the ID
+        await db.flush()  # To get the ID
         
         # Create API token
         token_record = APIToken(
@@ -496,7 +1072,7 @@ async def configure_odoo(config: OdooConfigRequest, db: Session = Depends(get_db
         )
         
         db.add(token_record)
-        db.commit()
+        await db.commit()
         
         logger.info(f"Configuration successful for user: {user.user_id}")
         
@@ -507,12 +1083,12 @@ async def configure_odoo(config: OdooConfigRequest, db: Session = Depends(get_db
             "mcp_url": f"http://145.223.102.57/mcp",  # Hostinger IP (via Nginx)
             "user_id": user.user_id
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Configuration error: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur lors de la configuration: {str(e)}")
 
 @app.post("/api/test-connection")
@@ -525,7 +1101,7 @@ async def test_odoo_connection(config: OdooConfigRequest):
         # Test Odoo connection
         client = OdooClient(config.odoo_url, config.odoo_db, config.odoo_username, config.odoo_password)
         
-        if client.test_connection():
+        if await client.test_connection():
             return {
                 "success": True,
                 "message": "Connexion Odoo réussie !"
@@ -535,7 +1111,7 @@ async def test_odoo_connection(config: OdooConfigRequest):
                 "success": False,
                 "message": "Impossible de se connecter à Odoo. Vérifiez vos identifiants."
             }
-            
+    
     except Exception as e:
         logger.error(f"Connection test error: {str(e)}")
         return {
@@ -547,11 +1123,12 @@ async def test_odoo_connection(config: OdooConfigRequest):
 class OdooMethodRequest(BaseModel):
     model: str
     method: str
-    domain: Optional[str] = None
-    fields: Optional[str] = None
+    domain: Optional[Union[str, list]] = None
+    fields: Optional[Union[str, List[str]]] = None
     limit: Optional[int] = None
-    ids: Optional[str] = None
-    values: Optional[str] = None
+    ids: Optional[Union[str, List[int]]] = None
+    values: Optional[Union[str, dict, list]] = None
+    offset: Optional[int] = None
 
 class OdooMethodResponse(BaseModel):
     success: bool
@@ -561,8 +1138,7 @@ class OdooMethodResponse(BaseModel):
 @app.post("/api/odoo/execute", response_model=OdooMethodResponse)
 async def execute_odoo_rest(
     request: OdooMethodRequest,
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
+    authorization: str = Header(None)
 ):
     """
     🚀 REST API endpoint for Make.com and other integrations
@@ -573,6 +1149,9 @@ async def execute_odoo_rest(
     **Authentication:**
     - Header: `Authorization: Bearer YOUR_API_TOKEN`
     
+    `domain`, `fields`, `ids` and `values` accept native JSON (arrays, objects)
+    as well as the string forms shown below. A malformed domain is rejected.
+    
     **Examples:**
     
     1. Search partners:
@@ -627,116 +1206,167 @@ async def execute_odoo_rest(
       }'
     ```
     """
+    odoo_client = await authorize_rest_call(authorization)
+    
+    try:
+        return await run_odoo_rest(request, odoo_client)
+    except SchedulerOverflow as e:
+        raise too_many_requests(e)
+
+async def authorize_rest_call(authorization: Optional[str], odoo_calls: int = 1) -> OdooClient:
+    """Resolve the REST caller's tenant and apply its rate limits"""
+    # Check authorization header
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    
+    token = authorization.split(" ", 1)[1]
+    
+    # Get Odoo client
+    try:
+        user_id, odoo_client = await resolve_token(token)
+    except HTTPException:
+        raise HTTPException(status_code=401, detail="Invalid API token")
+    
+    try:
+        await rate_limiter.check_request(token, user_id)
+        await rate_limiter.check_odoo_calls(token, user_id, odoo_calls)
+    except RateLimitExceeded as e:
+        raise too_many_requests(e)
+    
+    return odoo_client
+
+def too_many_requests(error: Union[SchedulerOverflow, RateLimitExceeded]) -> HTTPException:
+    """429 response for a call rejected by the scheduler or a rate limit"""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(int(error.retry_after))}
+    )
+
+async def run_odoo_rest_item(request: OdooMethodRequest, odoo_client: OdooClient) -> OdooMethodResponse:
+    """Batch item: a rejected call fails on its own instead of the whole batch"""
+    try:
+        return await run_odoo_rest(request, odoo_client)
+    except SchedulerOverflow as e:
+        return OdooMethodResponse(success=False, error=f"Too many requests: {str(e)}")
+
+async def run_odoo_rest(request: OdooMethodRequest, odoo_client: OdooClient) -> OdooMethodResponse:
+    """Execute one REST Odoo call for an already resolved tenant"""
     try:
-        # Check authorization header
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-        
-        token = authorization.split(" ", 1)[1]
-        
-        # Get Odoo client
         try:
-            odoo_client = get_odoo_client_from_token(token, db)
-        except HTTPException:
-            raise HTTPException(status_code=401, detail="Invalid API token")
-        
-        # Build arguments based on method
-        import json
-        args = []
-        kwargs = {}
-        
-        if request.method in ['search', 'search_read']:
-            # Parse domain
-            if request.domain:
-                try:
-                    parsed_domain = json.loads(request.domain)
-                    args.append(parsed_domain)
-                except:
-                    args.append([])
-            else:
-                args.append([])
-            
-            # Add kwargs
-            if request.fields:
-                kwargs['fields'] = [f.strip() for f in request.fields.split(',')]
-            if request.limit:
-                kwargs['limit'] = request.limit
-            elif request.limit is None:
-                kwargs['limit'] = 10  # Default limit
-                
-        elif request.method == 'read':
-            # Parse IDs
-            if request.ids:
-                id_list = [int(i.strip()) for i in request.ids.split(',')]
-                args.append(id_list)
-            else:
-                return OdooMethodResponse(success=False, error="'ids' requis pour la méthode 'read'")
-            
-            if request.fields:
-                kwargs['fields'] = [f.strip() for f in request.fields.split(',')]
-                
-        elif request.method == 'create':
-            # Parse values
-            if request.values:
-                try:
-                    parsed_values = json.loads(request.values)
-                    args.append([parsed_values])
-                except Exception as e:
-                    return OdooMethodResponse(success=False, error=f"Erreur lors du parsing de 'values': {str(e)}")
-            else:
-                return OdooMethodResponse(success=False, error="'values' requis pour la méthode 'create'")
-                
-        elif request.method == 'write':
-            # Parse IDs and values
-            if not request.ids:
-                return OdooMethodResponse(success=False, error="'ids' requis pour la méthode 'write'")
-            if not request.values:
-                return OdooMethodResponse(success=False, error="'values' requis pour la méthode 'write'")
-            
-            try:
-                id_list = [int(i.strip()) for i in request.ids.split(',')]
-                parsed_values = json.loads(request.values)
-                args.append(id_list)
-                args.append(parsed_values)
-            except Exception as e:
-                return OdooMethodResponse(success=False, error=f"Erreur lors du parsing: {str(e)}")
-                
-        elif request.method == 'unlink':
-            # Parse IDs
-            if request.ids:
-                id_list = [int(i.strip()) for i in request.ids.split(',')]
-                args.append(id_list)
-            else:
-                return OdooMethodResponse(success=False, error="'ids' requis pour la méthode 'unlink'")
-        
-        # Execute the method
-        result = odoo_client.execute_method(
-            model=request.model,
-            method=request.method,
-            args=args,
-            kwargs=kwargs
-        )
+            with tracing.span("args.normalize"):
+                odoo_request = normalize_request(
+                    request.model, request.method, request.domain, request.fields,
+                    request.limit, request.ids, request.values, request.offset, odoo_client.host
+                )
+            # Validate requested fields locally and execute (large reads are chunked)
+            result = await execute_request(odoo_client, odoo_request, entry="rest")
+        except ValueError as e:
+            return OdooMethodResponse(success=False, error=str(e))
         
         # Check for error
         if isinstance(result, dict) and 'error' in result:
             return OdooMethodResponse(success=False, error=str(result['error']))
         
         return OdooMethodResponse(success=True, data=result)
-        
-    except HTTPException:
+    
+    except SchedulerOverflow:
         raise
     except Exception as e:
         logger.error(f"Error executing Odoo method via REST API: {str(e)}")
         return OdooMethodResponse(success=False, error=str(e))
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run MCP Multi-Tenant server")
-    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
-    parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to bind to")
+class OdooBatchRequest(BaseModel):
+    requests: List[OdooMethodRequest]
+
+class OdooBatchResponse(BaseModel):
+    results: List[OdooMethodResponse]
+
+@app.post("/api/odoo/batch", response_model=OdooBatchResponse)
+async def execute_odoo_batch_rest(
+    batch: OdooBatchRequest,
+    authorization: str = Header(None)
+):
+    """
+    Execute several Odoo methods for one tenant in a single HTTP request.
+    
+    Calls run concurrently (bounded per tenant) and `results` follows the
+    order of `requests`. Each call succeeds or fails on its own.
+    
+    ```bash
+    curl -X POST http://145.223.102.57/api/odoo/batch \\
+      -H "Authorization: Bearer YOUR_TOKEN" \\
+      -H "Content-Type: application/json" \\
+      -d '{
+        "requests": [
+          {"model": "res.partner", "method": "search_read", "fields": "name", "limit": 5},
+          {"model": "res.country", "method": "search_read", "fields": "name,code"}
+        ]
+      }'
+    ```
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    if not batch.requests or len(batch.requests) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch must contain 1 to {BATCH_MAX_SIZE} requests")
+    
+    odoo_client = await authorize_rest_call(authorization, odoo_calls=len(batch.requests))
+    
+    results = await run_batch(
+        odoo_client,
+        [lambda item=item: run_odoo_rest_item(item, odoo_client) for item in batch.requests]
+    )
+    return OdooBatchResponse(results=results)
+
+class OdooStreamRequest(BaseModel):
+    model: str
+    domain: Optional[Union[str, list]] = None
+    fields: Optional[Union[str, List[str]]] = None
+    page_size: Optional[int] = None
+    cursor: Optional[int] = None
+
+@app.post("/api/odoo/stream")
+async def stream_odoo_rest(
+    request: OdooStreamRequest,
+    authorization: str = Header(None)
+):
+    """
+    Stream a large search_read as NDJSON, one line per page.
     
-    args = parser.parse_args()
+    Pages are read by increasing ID and sent as they arrive. Each line carries
+    a `cursor`; after an interruption, resend the request with the last
+    `cursor` received to resume.
     
-    logger.info(f"Starting MCP Multi-Tenant server on {args.host}:{args.port}")
+    ```bash
+    curl -N -X POST http://145.223.102.57/api/odoo/stream \\
+      -H "Authorization: Bearer YOUR_TOKEN" \\
+      -H "Content-Type: application/json" \\
+      -d '{"model": "account.move.line", "fields": "name,debit,credit", "page_size": 1000}'
+    ```
     
-    # Start the server
-    uvicorn.run(app, host=args.host, port=args.port)
+    Lines: `{"type": "records", ...}` per page, then `{"type": "end", ...}`
+    or `{"type": "error", ...}`.
+    """
+    odoo_client = await authorize_rest_call(authorization)
+    
+    try:
+        pages = await open_record_stream(
+            odoo_client, request.model, request.domain, request.fields, request.page_size, request.cursor
+        )
+    except SchedulerOverflow as e:
+        raise too_many_requests(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Erreur lors du parsing: {str(e)}")
+    
+    return StreamingResponse(
+        ndjson_stream(pages, request.cursor),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=STREAMING_HEADERS
+    )
+
+if __name__ == "__main__":
+    # Hand over to app.run_server (same options): spawned workers re-import the
+    # launching script, so starting uvicorn from here would load the app twice per worker
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+    os.execv(sys.executable, [sys.executable, "-m", "app.run_server", *sys.argv[1:]])
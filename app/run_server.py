@@ -0,0 +1,60 @@
+"""
+Production launcher for the MCP Multi-Tenant server (uvicorn, one or more workers)
+
+Kept apart from ``app.mcp_multi_tenant_server`` on purpose: uvicorn spawns its
+workers, and a spawned worker re-imports the launching script as ``__mp_main__``.
+Launching from here means each worker imports the application module only once.
+"""
+import argparse
+import sys
+import os
+import uvicorn
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lifecycle import (
+    SERVER_WORKERS, SERVER_LOOP, SERVER_HTTP, SERVER_GRACEFUL_TIMEOUT, SERVER_KEEPALIVE_TIMEOUT
+)
+from app.core.rate_limit import RATE_LIMIT_BACKEND
+from app.utils.logger import logger
+
+APP_IMPORT_PATH = "app.mcp_multi_tenant_server:app"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MCP Multi-Tenant server")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to bind to")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Worker processes")
+    parser.add_argument("--loop", type=str, default=SERVER_LOOP, choices=["auto", "uvloop", "asyncio"], help="Event loop")
+    parser.add_argument("--http", type=str, default=SERVER_HTTP, choices=["auto", "httptools", "h11"], help="HTTP parser")
+    parser.add_argument("--graceful-timeout", type=float, default=SERVER_GRACEFUL_TIMEOUT, help="Seconds to drain requests on SIGTERM")
+    
+    args = parser.parse_args(argv)
+    
+    logger.info(
+        f"Starting MCP Multi-Tenant server on {args.host}:{args.port} "
+        f"({args.workers} worker(s), loop={args.loop}, http={args.http})"
+    )
+    if args.workers > 1 and RATE_LIMIT_BACKEND != "sqlite":
+        logger.warning("RATE_LIMIT_BACKEND=memory: rate limits apply per worker, use sqlite to share them")
+    
+    # The app is imported by name (in each worker when there are several).
+    # On SIGTERM uvicorn stops accepting, waits for in-flight requests up to the
+    # graceful timeout, then runs the shutdown handlers (Odoo call drain, usage
+    # flush, pool close, log flush).
+    # log_config=None: uvicorn logs go through the structured logger
+    uvicorn.run(
+        APP_IMPORT_PATH,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=SERVER_KEEPALIVE_TIMEOUT,
+        log_config=None
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Journalisation structurée (JSON), asynchrone, expurgée et échantillonnée
+"""
+
+import os
+import sys
+import json
+import random
+import re
+import uuid
+import inspect
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from loguru import logger
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json (une ligne par entrée, pour l'agrégation) ou text (lisible en développement)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Fichier de sortie ; stderr si vide
+LOG_FILE = os.getenv("LOG_FILE", "")
+# Sérialisation et écriture dans un thread dédié : l'appelant ne fait qu'empiler l'entrée
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "true").lower() == "true"
+# Longueur maximale d'une valeur journalisée (paramètres, charges utiles)
+LOG_MAX_FIELD_LENGTH = int(os.getenv("LOG_MAX_FIELD_LENGTH", "256"))
+# Part conservée, par niveau, des lignes à fort volume (marquées sampled=True) ;
+# les avertissements et erreurs ne sont jamais échantillonnés
+LOG_SAMPLE_RATES: Dict[str, float] = {
+    level.upper(): float(rate) for level, rate in json.loads(os.getenv("LOG_SAMPLE_RATES", '{"DEBUG": 0.01, "INFO": 0.1}')).items()
+}
+
+REDACTED = "***"
+SENSITIVE_KEYS = {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key", "api_key", "apikey", "session_id"}
+SENSITIVE_MARKERS = ("password", "secret", "token")
+MAX_ITEMS = 20
+MAX_DEPTH = 4
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Identifiant de corrélation : celui du client s'il est raisonnable, sinon un nouveau"""
+    if incoming and _REQUEST_ID_PATTERN.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+def is_sensitive(key: Any) -> bool:
+    name = str(key).lower()
+    return name in SENSITIVE_KEYS or any(marker in name for marker in SENSITIVE_MARKERS)
+
+def truncate(value: Any, limit: int = LOG_MAX_FIELD_LENGTH) -> str:
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…(+{len(text) - limit})"
+
+def redact(value: Any, depth: int = 0) -> Any:
+    """Copie journalisable : clés sensibles masquées, chaînes tronquées, listes et profondeur bornées"""
+    if isinstance(value, dict):
+        if depth >= MAX_DEPTH:
+            return f"{{…{len(value)} keys}}"
+        return {key: REDACTED if is_sensitive(key) else redact(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if depth >= MAX_DEPTH:
+            return f"[…{len(value)} items]"
+        items = [redact(item, depth + 1) for item in value[:MAX_ITEMS]]
+        if len(value) > MAX_ITEMS:
+            items.append(f"…(+{len(value) - MAX_ITEMS})")
+        return items
+    if isinstance(value, str):
+        return truncate(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate(value)
+
+def _keep(record) -> bool:
+    """Échantillonnage des lignes à fort volume selon leur niveau"""
+    if not record["extra"].get("sampled"):
+        return True
+    rate = LOG_SAMPLE_RATES.get(record["level"].name, 1.0)
+    return rate >= 1 or random.random() < rate
+
+def _add_request_id(record):
+    record["extra"].setdefault("request_id", request_id.get())
+
+class JsonSink:
+    """Écrit une ligne JSON par entrée ; appelé dans le thread d'écriture avec LOG_ENQUEUE"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, message):
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+        }
+        for key, value in record["extra"].items():
+            if key != "sampled" and value != "":
+                entry[key] = REDACTED if is_sensitive(key) else redact(value)
+        # Le format du handler est vide : le message formaté se réduit à la trace de pile
+        exception = str(message).strip()
+        if exception:
+            entry["exception"] = exception
+        self.stream.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+
+class InterceptHandler(logging.Handler):
+    """Redirige la journalisation standard (uvicorn, sqlalchemy...) vers loguru"""
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        frame, depth = inspect.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        # Journal d'accès : une ligne par requête HTTP
+        sampled = record.name == "uvicorn.access"
+        logger.bind(sampled=sampled).opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[request_id]} | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+def setup_logging():
+    """(Re)configurer loguru : un seul handler, JSON ou texte, en file d'attente"""
+    stream = open(LOG_FILE, "a", encoding="utf-8", buffering=1) if LOG_FILE else sys.stderr
+    logger.remove()
+    logger.configure(patcher=_add_request_id)
+    if LOG_FORMAT == "json":
+        logger.add(JsonSink(stream).write, level=LOG_LEVEL, format="", filter=_keep, enqueue=LOG_ENQUEUE, colorize=False)
+    else:
+        logger.add(stream, level=LOG_LEVEL, format=TEXT_FORMAT, filter=_keep, enqueue=LOG_ENQUEUE)
+    logging.basicConfig(handlers=[InterceptHandler()], level=logging.getLevelName(LOG_LEVEL), force=True)
+    # Une ligne par appel Odoo sinon : les appels sont déjà mesurés (métriques, traces)
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+setup_logging()
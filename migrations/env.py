@@ -0,0 +1,39 @@
+"""
+Environnement Alembic : base de DATABASE_URL, métadonnées de app.core.models
+"""
+
+from logging.config import fileConfig
+from alembic import context
+
+from app.core.database import DATABASE_URL, engine
+from app.core.models import Base
+
+config = context.config
+# Appelé par init_db(), la journalisation est déjà configurée par l'application
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """Générer le SQL sans connexion (alembic upgrade head --sql)"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        # render_as_batch : ALTER TABLE émulés sous SQLite
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,51 @@
+"""Schéma initial : utilisateurs et tokens API (tables créées à l'origine par create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(36)),
+        sa.Column("odoo_url", sa.String(255), nullable=False),
+        sa.Column("odoo_db", sa.String(100), nullable=False),
+        sa.Column("odoo_username", sa.String(100), nullable=False),
+        sa.Column("odoo_password", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("user_name", sa.String(100)),
+        sa.Column("user_email", sa.String(255)),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_user_id", "users", ["user_id"], unique=True)
+    
+    op.create_table(
+        "api_tokens",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("token", sa.String(64), nullable=False),
+        sa.Column("user_id", sa.String(36), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("last_used", sa.DateTime(timezone=True)),
+        sa.Column("usage_count", sa.Integer()),
+    )
+    op.create_index("ix_api_tokens_id", "api_tokens", ["id"])
+    op.create_index("ix_api_tokens_token", "api_tokens", ["token"], unique=True)
+    op.create_index("ix_api_tokens_user_id", "api_tokens", ["user_id"])
+
+def downgrade():
+    op.drop_table("api_tokens")
+    op.drop_table("users")
@@ -0,0 +1,36 @@
+"""Usage agrégé par token API et par heure
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:15:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "api_token_usage",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("api_token_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(36), nullable=False),
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("requests", sa.Integer()),
+        sa.Column("odoo_calls", sa.Integer()),
+        sa.Column("bytes_out", sa.BigInteger()),
+        sa.Column("total_latency_ms", sa.Float()),
+        sa.Column("max_latency_ms", sa.Float()),
+        sa.UniqueConstraint("api_token_id", "period_start"),
+    )
+    op.create_index("ix_api_token_usage_id", "api_token_usage", ["id"])
+    op.create_index("ix_api_token_usage_api_token_id", "api_token_usage", ["api_token_id"])
+    op.create_index("ix_api_token_usage_user_id", "api_token_usage", ["user_id"])
+    op.create_index("ix_api_token_usage_period_start", "api_token_usage", ["period_start"])
+
+def downgrade():
+    op.drop_table("api_token_usage")
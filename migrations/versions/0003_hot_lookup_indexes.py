@@ -0,0 +1,33 @@
+"""Index des recherches fréquentes (préchauffage, usage par utilisateur)
+
+La résolution des tokens (api_tokens.token, users.user_id) et l'écriture de
+l'usage (api_token_id, period_start) utilisent déjà des index uniques.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:30:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def _create_index(name: str, table: str, columns: list):
+    # Déjà présent si la base a été créée par create_all avec les modèles actuels
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns)
+
+def upgrade():
+    # Tokens d'un utilisateur par dernier usage (préchauffage des hôtes Odoo)
+    _create_index("ix_api_tokens_user_last_used", "api_tokens", ["user_id", "last_used"])
+    # Usage d'un utilisateur sur une période
+    _create_index("ix_api_token_usage_user_period", "api_token_usage", ["user_id", "period_start"])
+
+def downgrade():
+    op.drop_index("ix_api_token_usage_user_period", table_name="api_token_usage")
+    op.drop_index("ix_api_tokens_user_last_used", table_name="api_tokens")
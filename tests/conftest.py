@@ -0,0 +1,13 @@
+"""
+Configuration pytest : imports de ``app`` depuis la racine du dépôt
+
+Les scripts de tests de déploiement visent un serveur déjà lancé et une
+instance Odoo réelle : ils ne sont pas collectés.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+collect_ignore = ["test_deployment.py", "run_all_tests.py"]
@@ -0,0 +1,91 @@
+"""
+Tests du disjoncteur par instance Odoo
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import odoo_client as odoo_client_module
+from app.core.circuit_breaker import EndpointHealth, CircuitOpenError, CLOSED, OPEN, HALF_OPEN, endpoint_registry
+from app.core.odoo_client import OdooClient
+
+def _expire(endpoint: EndpointHealth):
+    endpoint.opened_at -= endpoint.open_seconds
+
+def test_breaker_opens_after_consecutive_failures():
+    endpoint = EndpointHealth(consecutive_failures=3, min_calls=100, open_seconds=30)
+    for _ in range(2):
+        endpoint.before_call()
+        endpoint.record(False, 0.01)
+    assert endpoint.state == CLOSED
+    endpoint.record(False, 0.01)
+    assert endpoint.state == OPEN
+    assert endpoint.rejecting()
+    with pytest.raises(CircuitOpenError):
+        endpoint.before_call()
+
+def test_breaker_opens_on_error_rate():
+    endpoint = EndpointHealth(consecutive_failures=100, min_calls=4, error_rate=0.5)
+    for ok in (True, False, True, False):
+        endpoint.record(ok, 0.01)
+    assert endpoint.state == OPEN
+
+def test_breaker_half_open_probe_closes():
+    endpoint = EndpointHealth(consecutive_failures=1, open_seconds=30)
+    endpoint.record(False, 0.01)
+    _expire(endpoint)
+    assert not endpoint.rejecting()
+    
+    endpoint.before_call()
+    assert endpoint.state == HALF_OPEN
+    # Un seul appel de test à la fois
+    with pytest.raises(CircuitOpenError):
+        endpoint.before_call()
+    
+    endpoint.record(True, 0.01)
+    assert endpoint.state == CLOSED
+    endpoint.before_call()
+
+def test_breaker_failed_probe_reopens():
+    endpoint = EndpointHealth(consecutive_failures=1, open_seconds=30)
+    endpoint.record(False, 0.01)
+    _expire(endpoint)
+    endpoint.before_call()
+    endpoint.record(False, 0.01)
+    assert endpoint.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        endpoint.before_call()
+
+def test_breaker_cancelled_probe_allows_another():
+    endpoint = EndpointHealth(consecutive_failures=1, open_seconds=30)
+    endpoint.record(False, 0.01)
+    _expire(endpoint)
+    endpoint.before_call()
+    endpoint.cancel()
+    endpoint.before_call()
+    assert endpoint.state == HALF_OPEN
+
+# Issue des appels réels
+
+@pytest.mark.parametrize("name, response, ok", [
+    ("result", httpx.Response(200, json={"jsonrpc": "2.0", "result": 7}), True),
+    ("odoo-error", httpx.Response(200, json={"jsonrpc": "2.0", "error": {"message": "AccessDenied"}}), True),
+    ("html", httpx.Response(200, text="<html>Maintenance</html>"), False),
+    ("bad-gateway", httpx.Response(502, text="Bad Gateway"), False),
+])
+def test_unreadable_or_failed_responses_count_as_failures(monkeypatch, name, response, ok):
+    transport = httpx.MockTransport(lambda request: response)
+    monkeypatch.setattr(odoo_client_module, "_http_client", httpx.AsyncClient(transport=transport))
+    client = OdooClient(f"https://breaker-{name}.odoo.com", "db", "user", "secret")
+    
+    async def call():
+        try:
+            await client._post({"jsonrpc": "2.0", "method": "call", "params": {}})
+        except (ValueError, httpx.HTTPStatusError):
+            pass
+    
+    asyncio.run(call())
+    outcomes = list(endpoint_registry.get(client.host)._outcomes)
+    assert [outcome[1] for outcome in outcomes] == [ok]
@@ -0,0 +1,73 @@
+"""
+Tests de la compression négociée des réponses
+"""
+
+import zlib
+import asyncio
+
+import pytest
+
+from app.core import compression
+from app.core.compression import (
+    negotiate_encoding, route_policy, select_encoding, skip_compression, weak_etag,
+    compress_body, compress_stream
+)
+
+def test_negotiate_encoding_honours_quality_values():
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*") == compression.SUPPORTED_ENCODINGS[0]
+    assert negotiate_encoding("gzip;q=1, *;q=0") == "gzip"
+
+def test_route_policy_uses_longest_prefix():
+    assert route_policy("/mcp") == "on"
+    assert route_policy("/static/css/landing.css") == "off"
+
+def test_select_encoding():
+    assert select_encoding("/mcp", "gzip", "application/json", False) == "gzip"
+    assert select_encoding("/mcp", "gzip", "image/png", False) is None
+    assert select_encoding("/static/css/landing.css", "gzip", "text/css", False) is None
+
+def test_select_encoding_buffered_route_skips_streams(monkeypatch):
+    monkeypatch.setitem(compression.COMPRESSION_ROUTES, "/api/odoo/stream", "buffered")
+    assert select_encoding("/api/odoo/stream", "gzip", "application/x-ndjson", True) is None
+    assert select_encoding("/api/odoo/stream", "gzip", "application/json", False) == "gzip"
+
+@pytest.mark.parametrize("method, status, headers, skipped", [
+    ("GET", 200, {}, False),
+    ("HEAD", 200, {}, True),
+    ("GET", 204, {}, True),
+    ("GET", 304, {}, True),
+    ("GET", 206, {"content-range": "bytes 0-4999/17189"}, True),
+    ("GET", 200, {"content-range": "bytes 0-4999/17189"}, True),
+    ("GET", 200, {"content-encoding": "br"}, True),
+])
+def test_skip_compression(method, status, headers, skipped):
+    assert skip_compression(method, status, headers) is skipped
+
+def test_weak_etag():
+    assert weak_etag('"abc"') == 'W/"abc"'
+    assert weak_etag('W/"abc"') == 'W/"abc"'
+
+def test_compress_body_round_trip():
+    body = b'{"result": [' + b'{"name": "x"},' * 200 + b'{}]}'
+    compressed = compress_body(body, "gzip")
+    assert len(compressed) < len(body)
+    assert zlib.decompress(compressed, 16 + zlib.MAX_WBITS) == body
+
+def test_compress_stream_flushes_each_chunk():
+    async def chunks():
+        yield b'{"type": "records"}\n'
+        yield b'{"type": "end"}\n'
+    
+    async def scenario():
+        return [part async for part in compress_stream(chunks(), "gzip")]
+    
+    parts = asyncio.run(scenario())
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Chaque morceau est décodable dès sa réception
+    assert decoder.decompress(parts[0]) == b'{"type": "records"}\n'
+    assert decoder.decompress(parts[1]) == b'{"type": "end"}\n'
+    assert decoder.decompress(b"".join(parts[2:])) == b""
+    assert decoder.eof
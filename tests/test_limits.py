@@ -0,0 +1,56 @@
+"""
+Tests des limites de recherche (défaut et maximum par tenant et par modèle) et de la pagination
+"""
+
+import pytest
+
+from app.core.limits import LimitPolicy
+from app.core.odoo_request import InvalidOdooRequest, normalize_request, with_pagination
+from app.core import odoo_request
+
+OVERRIDES = {
+    "models": {"account.move.line": {"max": 200}},
+    "tenants": {"acme.odoo.com": {"default": 20, "max": 500, "models": {"crm.lead": {"max": 100}}}},
+}
+
+@pytest.mark.parametrize("host, model, expected", [
+    (None, "res.partner", (10, 1000)),
+    (None, "account.move.line", (10, 200)),
+    ("acme.odoo.com", "res.partner", (20, 500)),
+    ("acme.odoo.com", "account.move.line", (20, 500)),
+    ("acme.odoo.com", "crm.lead", (20, 100)),
+    ("other.odoo.com", "crm.lead", (10, 1000)),
+])
+def test_most_specific_layer_wins(host, model, expected):
+    assert LimitPolicy(10, 1000, OVERRIDES).limits_for(host, model) == expected
+
+def test_default_never_exceeds_maximum():
+    policy = LimitPolicy(10, 1000, {"models": {"x.model": {"default": 50, "max": 5}}})
+    assert policy.limits_for(None, "x.model") == (5, 5)
+
+@pytest.mark.parametrize("requested, expected", [(None, 10), (0, 10), (30, 30), (5000, 200)])
+def test_resolve(requested, expected):
+    assert LimitPolicy(10, 1000, OVERRIDES).resolve(None, "account.move.line", requested) == expected
+
+def test_normalize_request_applies_the_tenant_policy(monkeypatch):
+    monkeypatch.setattr(odoo_request, "limit_policy", LimitPolicy(10, 1000, OVERRIDES))
+    assert normalize_request("crm.lead", "search_read", host="acme.odoo.com").kwargs["limit"] == 20
+    assert normalize_request("crm.lead", "search_read", limit=10 ** 6, host="acme.odoo.com").kwargs["limit"] == 100
+    with pytest.raises(InvalidOdooRequest, match="'limit'"):
+        normalize_request("crm.lead", "search_read", limit=-1)
+    with pytest.raises(InvalidOdooRequest, match="'limit'"):
+        normalize_request("crm.lead", "search_read", limit="10")
+
+def test_pagination_with_total_count():
+    page = with_pagination({"result": [{"id": 3}, {"id": 4}]}, {"limit": 2, "offset": 2}, total_count=5)
+    assert page == {"result": [{"id": 3}, {"id": 4}], "offset": 2, "limit": 2, "next_offset": 4, "total_count": 5}
+    last = with_pagination({"result": [{"id": 5}]}, {"limit": 2, "offset": 4}, total_count=5)
+    assert last["next_offset"] is None
+
+def test_pagination_without_total_count_guesses_from_page_size():
+    assert with_pagination({"result": [1, 2]}, {"limit": 2})["next_offset"] == 2
+    assert with_pagination({"result": [1]}, {"limit": 2})["next_offset"] is None
+
+def test_pagination_leaves_errors_and_counts_untouched():
+    assert with_pagination({"error": "x"}, {"limit": 2}) == {"error": "x"}
+    assert with_pagination({"result": 12}, {"limit": 2}) == {"result": 12}
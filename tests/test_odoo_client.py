@@ -0,0 +1,51 @@
+"""
+Tests du client Odoo (JSON-RPC simulé avec httpx.MockTransport)
+"""
+
+import json
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import odoo_client as odoo_client_module
+from app.core.odoo_client import OdooClient
+from app.core.result_cache import result_cache
+
+class FakeOdoo:
+    """Instance Odoo simulée : compte les appels execute_kw"""
+    
+    def __init__(self):
+        self.up = True
+        self.calls = []
+    
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        params = json.loads(request.content)["params"]
+        if params["method"] == "authenticate":
+            return httpx.Response(200, json={"jsonrpc": "2.0", "result": 7})
+        self.calls.append((params["args"][3], params["args"][4]))
+        if not self.up:
+            return httpx.Response(200, json={"jsonrpc": "2.0", "error": {"message": "Odoo Server Error", "data": {"name": "odoo.exceptions.UserError"}}})
+        return httpx.Response(200, json={"jsonrpc": "2.0", "result": [{"id": 7, "name": "Admin"}]})
+
+@pytest.fixture
+def odoo(monkeypatch):
+    fake = FakeOdoo()
+    result_cache.clear()
+    monkeypatch.setattr(odoo_client_module, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(fake.handler)))
+    yield fake
+    result_cache.clear()
+
+def test_test_connection_reaches_odoo_every_time(odoo):
+    # res.users est mis en cache 60 s : le test de connexion ne doit pas en profiter
+    assert result_cache.ttl_for("res.users", "search_read") > 0
+    client = OdooClient("https://probe.odoo.com", "db", "admin", "secret")
+    
+    async def scenario():
+        first = await client.test_connection()
+        odoo.up = False
+        second = await client.test_connection()
+        return first, second
+    
+    assert asyncio.run(scenario()) == (True, False)
+    assert odoo.calls == [("res.users", "search_read"), ("res.users", "search_read")]
@@ -0,0 +1,110 @@
+"""
+Tests de la normalisation des appels Odoo (domaines, champs, identifiants, valeurs)
+"""
+
+import pytest
+
+from app.core.odoo_request import (
+    InvalidOdooRequest, normalize_request, parse_domain, parse_fields, parse_ids, parse_values
+)
+
+# Domaines
+
+@pytest.mark.parametrize("domain", [
+    [],
+    [["name", "ilike", "acme"]],
+    ["|", ["is_company", "=", True], ["name", "=", "x"]],
+    ["&", "!", ["active", "=", False], ["partner_id.name", "in", ["a", "b"]]],
+    '[["id", ">", 10]]',
+    [(1, "=", 1)],
+])
+def test_parse_domain_accepts_valid_domains(domain):
+    assert isinstance(parse_domain(domain), list)
+
+@pytest.mark.parametrize("domain, message", [
+    (["&", ["name", "=", "x"]], "opérandes manquants pour '&'"),
+    (["|"], "opérandes manquants pour '|'"),
+    (["!"], "opérandes manquants pour '!'"),
+    (["&", "&", ["a", "=", 1], ["b", "=", 2]], "opérandes manquants pour '&'"),
+    (["^", ["a", "=", 1], ["b", "=", 2]], "opérateur logique inconnu"),
+    ([["name", "="]], "doit être [champ, opérateur, valeur]"),
+    ([["name", "=", "x", "y"]], "doit être [champ, opérateur, valeur]"),
+    ([["name", "equals", "x"]], "opérateur inconnu"),
+    ([["name; drop", "=", "x"]], "champ invalide"),
+    ('{"name": "x"}', "doit être un tableau JSON"),
+    ("[[", "n'est pas un JSON valide"),
+])
+def test_parse_domain_rejects_malformed_domains(domain, message):
+    with pytest.raises(InvalidOdooRequest) as error:
+        parse_domain(domain)
+    assert message in str(error.value)
+
+# Champs, identifiants, valeurs
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("") is None
+    assert parse_fields("name, email,,phone") == ["name", "email", "phone"]
+    assert parse_fields(["name", "partner_id"]) == ["name", "partner_id"]
+
+@pytest.mark.parametrize("fields, message", [
+    ("partner_id.name", "chemins pointés acceptés dans le domaine uniquement"),
+    (["name", 1], "nom de champ invalide 1"),
+    ("name;drop", "nom de champ invalide"),
+    ({"name": True}, "doit être une liste de noms de champs"),
+])
+def test_parse_fields_rejects_invalid_names(fields, message):
+    with pytest.raises(InvalidOdooRequest, match=message):
+        parse_fields(fields)
+
+def test_parse_ids():
+    assert parse_ids("1, 2,3") == [1, 2, 3]
+    assert parse_ids("[4, 5]") == [4, 5]
+    assert parse_ids(7) == [7]
+    assert parse_ids([1.0, "2"]) == [1, 2]
+
+@pytest.mark.parametrize("ids", [[0], [-1], [True], [1.5], ["x"], {"id": 1}])
+def test_parse_ids_rejects_invalid_ids(ids):
+    with pytest.raises(InvalidOdooRequest):
+        parse_ids(ids)
+
+def test_parse_ids_is_bounded():
+    with pytest.raises(InvalidOdooRequest, match="maximum 3"):
+        parse_ids([1, 2, 3, 4], max_ids=3)
+
+def test_parse_values():
+    assert parse_values('{"name": "x"}') == {"name": "x"}
+    assert parse_values([{"name": "a"}, {"name": "b"}], allow_list=True) == [{"name": "a"}, {"name": "b"}]
+    with pytest.raises(InvalidOdooRequest):
+        parse_values([{"name": "a"}])
+    with pytest.raises(InvalidOdooRequest):
+        parse_values("not json")
+
+# Appel complet
+
+def test_equivalent_requests_share_a_cache_key():
+    # Forme MCP (textes) et forme REST (JSON natif)
+    mcp = normalize_request("res.partner", "search_read", domain='[["is_company", "=", true]]', fields="name,email", limit=5)
+    rest = normalize_request("res.partner", "search_read", domain=[["is_company", "=", True]], fields=["name", "email"], limit=5)
+    assert mcp == rest and mcp.cache_key == rest.cache_key
+    assert mcp.args == [[["is_company", "=", True]]]
+    assert mcp.kwargs == {"fields": ["name", "email"], "limit": 5}
+
+def test_normalize_write_and_create():
+    write = normalize_request("res.partner", "write", ids="1,2", values='{"name": "x"}')
+    assert write.args == [[1, 2], {"name": "x"}] and write.kwargs == {}
+    create = normalize_request("res.partner", "create", values={"name": "x"})
+    assert create.args == [[{"name": "x"}]]
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"model": "Res Partner", "method": "search"}, "Modèle invalide"),
+    ({"model": "res.partner", "method": "_private"}, "Méthode invalide"),
+    ({"model": "res.partner", "method": "read"}, "'ids' requis"),
+    ({"model": "res.partner", "method": "write", "ids": [1]}, "'values' requis"),
+    ({"model": "res.partner", "method": "unlink"}, "'ids' requis"),
+    ({"model": "res.partner", "method": "create"}, "'values' requis"),
+    ({"model": "res.partner", "method": "search", "offset": -1}, "'offset' doit être un entier positif ou nul"),
+])
+def test_normalize_request_rejects_incomplete_calls(kwargs, message):
+    with pytest.raises(InvalidOdooRequest, match=message):
+        normalize_request(**kwargs)
@@ -0,0 +1,107 @@
+"""
+Tests de la limitation de débit (token bucket)
+"""
+
+import asyncio
+
+import pytest
+
+import app.core.rate_limit as rate_limit_module
+from app.core.rate_limit import (
+    MemoryRateLimitBackend, SQLiteRateLimitBackend, RateLimiter, RateLimitExceeded
+)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit_module.time, "time", lambda: now[0])
+    return now
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRateLimitBackend(str(tmp_path / "buckets.db"))
+    return MemoryRateLimitBackend()
+
+def test_burst_then_refill(backend, clock):
+    for _ in range(3):
+        assert backend.consume("k", rate=1, capacity=3) == (True, 0)
+    allowed, retry_after = backend.consume("k", rate=1, capacity=3)
+    assert not allowed and retry_after == pytest.approx(1)
+    clock[0] += 1
+    assert backend.consume("k", rate=1, capacity=3)[0]
+    assert not backend.consume("k", rate=1, capacity=3)[0]
+
+def test_refill_is_capped_at_capacity(backend, clock):
+    backend.consume("k", rate=1, capacity=2, cost=2)
+    clock[0] += 100
+    assert backend.consume("k", rate=1, capacity=2, cost=2)[0]
+    assert not backend.consume("k", rate=1, capacity=2)[0]
+
+def test_keys_are_independent(backend, clock):
+    assert backend.consume("a", rate=1, capacity=1)[0]
+    assert not backend.consume("a", rate=1, capacity=1)[0]
+    assert backend.consume("b", rate=1, capacity=1)[0]
+
+def test_rejected_cost_is_not_consumed(backend, clock):
+    assert not backend.consume("k", rate=1, capacity=5, cost=6)[0]
+    assert backend.consume("k", rate=1, capacity=5, cost=5)[0]
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / "buckets.db")
+    assert SQLiteRateLimitBackend(path).consume("k", rate=1, capacity=1)[0]
+    assert not SQLiteRateLimitBackend(path).consume("k", rate=1, capacity=1)[0]
+
+# RateLimiter
+
+def test_check_request_counts_token_and_user(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_TOKEN_BURST", 5)
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_USER_BURST", 2)
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    
+    async def scenario():
+        await limiter.check_request("t1", "u1")
+        await limiter.check_request("t2", "u1")
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.check_request("t3", "u1")
+        assert exc.value.retry_after >= 1
+        await limiter.check_request("t3", None)
+    
+    asyncio.run(scenario())
+    assert limiter.rejected == 1
+
+def test_check_odoo_calls_uses_the_batch_size(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_TOKEN_CALLS_PER_MINUTE", 10)
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    
+    async def scenario():
+        await limiter.check_odoo_calls("t1", None, count=8)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.check_odoo_calls("t1", None, count=3)
+        await limiter.check_odoo_calls("t1", None, count=2)
+    
+    asyncio.run(scenario())
+
+def test_zero_rate_disables_the_limit(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_TOKEN_RPS", 0)
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_TOKEN_BURST", 1)
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    
+    async def scenario():
+        for _ in range(10):
+            await limiter.check_request("t1", None)
+    
+    asyncio.run(scenario())
+    assert limiter.rejected == 0
+
+def test_blocking_backend_runs_in_a_thread(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_TOKEN_BURST", 1)
+    limiter = RateLimiter(SQLiteRateLimitBackend(str(tmp_path / "buckets.db")))
+    
+    async def scenario():
+        await limiter.check_request("t1", None)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.check_request("t1", None)
+    
+    asyncio.run(scenario())
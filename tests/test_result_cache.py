@@ -0,0 +1,107 @@
+"""
+Tests du cache de résultats par tenant et de son invalidation par les écritures
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.result_cache import ResultCache, make_cache_key, result_cache
+from app.core.odoo_client import OdooClient
+
+def test_cache_key_ignores_kwargs_order():
+    assert make_cache_key("res.partner", "search_read", [[]], {"fields": ["name"], "limit": 5}) == \
+        make_cache_key("res.partner", "search_read", [[]], {"limit": 5, "fields": ["name"]})
+
+def test_ttl_only_for_read_only_methods():
+    cache = ResultCache(ttl_policy={"res.country": 3600})
+    assert cache.ttl_for("res.country", "search_read") == 3600
+    assert cache.ttl_for("res.country", "write") == 0
+    assert cache.ttl_for("res.partner", "search_read") == 0
+
+def test_entries_expire(monkeypatch):
+    cache = ResultCache()
+    now = [100.0]
+    monkeypatch.setattr("app.core.result_cache.time.monotonic", lambda: now[0])
+    cache.set("t1", "res.country", "k", {"result": [1]}, ttl=10)
+    assert cache.get("t1", "k") == {"result": [1]}
+    now[0] = 111.0
+    assert cache.get("t1", "k") is None
+    assert cache.stats()["entries"] == 0
+
+def test_entries_are_per_tenant():
+    cache = ResultCache()
+    cache.set("t1", "res.country", "k", {"result": [1]}, ttl=60)
+    assert cache.get("t2", "k") is None
+
+def test_lru_eviction_keeps_size_bounded():
+    cache = ResultCache(max_bytes=110)
+    for key in ("a", "b", "c"):
+        cache.set("t1", "m", key, {"result": "x" * 20}, ttl=60)
+    # "a" relu : "b" devient le plus ancien
+    cache.get("t1", "a")
+    cache.set("t1", "m", "d", {"result": "x" * 20}, ttl=60)
+    assert cache.get("t1", "b") is None
+    assert cache.get("t1", "a") is not None
+    assert cache.stats()["bytes"] <= 110
+    assert cache.stats()["evictions"] >= 1
+
+def test_invalidate_model_is_scoped_to_tenant_and_model():
+    cache = ResultCache()
+    cache.set("t1", "res.partner", "p1", {"result": 1}, ttl=60)
+    cache.set("t1", "res.country", "c1", {"result": 2}, ttl=60)
+    cache.set("t2", "res.partner", "p2", {"result": 3}, ttl=60)
+    cache.invalidate_model("t1", "res.partner")
+    assert cache.get("t1", "p1") is None
+    assert cache.get("t1", "c1") is not None
+    assert cache.get("t2", "p2") is not None
+
+def test_read_overlapping_a_write_is_not_cached():
+    cache = ResultCache()
+    generation = cache.generation("t1", "res.partner")
+    cache.invalidate_model("t1", "res.partner")
+    cache.set("t1", "res.partner", "k", {"result": "old"}, ttl=60, generation=generation)
+    assert cache.get("t1", "k") is None
+    
+    cache.set("t1", "res.partner", "k", {"result": "new"}, ttl=60, generation=cache.generation("t1", "res.partner"))
+    assert cache.get("t1", "k") == {"result": "new"}
+
+# Lectures et écritures via OdooClient
+
+@pytest.fixture
+def client():
+    result_cache.clear()
+    odoo = OdooClient("https://cache-test.odoo.com", "db", "user", "secret")
+    odoo.calls = []
+    yield odoo
+    result_cache.clear()
+
+def _fake_rpc(odoo, write_outcome):
+    async def execute_kw(model, method, args=None, kwargs=None):
+        odoo.calls.append(method)
+        if method == "write":
+            return await write_outcome()
+        return {"result": [{"name": f"read {len(odoo.calls)}"}]}
+    odoo._execute_kw = execute_kw
+
+@pytest.mark.parametrize("write_outcome", ["ok", "error", "timeout"])
+def test_write_invalidates_cached_reads_whatever_its_outcome(client, write_outcome):
+    async def outcome():
+        if write_outcome == "timeout":
+            raise httpx.ReadTimeout("no response")
+        return {"error": "Erreur Odoo"} if write_outcome == "error" else {"result": True}
+    
+    _fake_rpc(client, outcome)
+    
+    async def scenario():
+        first = await client.execute_method("res.users", "search_read", [[]], {"fields": ["name"]})
+        assert await client.execute_method("res.users", "search_read", [[]], {"fields": ["name"]}) == first
+        try:
+            await client.execute_method("res.users", "write", [[1], {"name": "x"}])
+        except httpx.ReadTimeout:
+            pass
+        return await client.execute_method("res.users", "search_read", [[]], {"fields": ["name"]})
+    
+    assert asyncio.run(scenario()) == {"result": [{"name": "read 3"}]}
+    assert client.calls == ["search_read", "write", "search_read"]
@@ -0,0 +1,78 @@
+"""
+Tests de l'ordonnanceur des appels Odoo (limites par tenant et par hôte)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.scheduler import OdooCallScheduler, SchedulerOverflow
+
+def test_scheduler_rejects_when_tenant_queue_is_full():
+    async def scenario():
+        scheduler = OdooCallScheduler(tenant_concurrency=1, host_concurrency=10, tenant_queue=1, max_wait=5)
+        await scheduler.acquire("t1", "h")
+        waiter = asyncio.ensure_future(scheduler.acquire("t1", "h"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 1
+        
+        with pytest.raises(SchedulerOverflow):
+            await scheduler.acquire("t1", "h")
+        # Un autre tenant du même hôte n'est pas concerné
+        await scheduler.acquire("t2", "h")
+        
+        scheduler._release("t1", "h")
+        await waiter
+        assert scheduler.stats() == {"inflight": 2, "queued": 0, "hosts": 1, "rejected": 1}
+    
+    asyncio.run(scenario())
+
+def test_scheduler_timeout_leaves_no_slot_or_waiter():
+    async def scenario():
+        scheduler = OdooCallScheduler(tenant_concurrency=1, host_concurrency=10, tenant_queue=4, max_wait=0.05)
+        async with scheduler.slot("t1", "h"):
+            with pytest.raises(SchedulerOverflow):
+                async with scheduler.slot("t1", "h"):
+                    pass
+            assert scheduler.stats()["queued"] == 0
+        assert scheduler.stats() == {"inflight": 0, "queued": 0, "hosts": 0, "rejected": 1}
+        
+        # La place libérée est de nouveau disponible immédiatement
+        async with scheduler.slot("t1", "h"):
+            assert scheduler.stats()["inflight"] == 1
+    
+    asyncio.run(scenario())
+
+def test_scheduler_cancelled_waiter_is_removed():
+    async def scenario():
+        scheduler = OdooCallScheduler(tenant_concurrency=1, host_concurrency=10, tenant_queue=4, max_wait=5)
+        await scheduler.acquire("t1", "h")
+        waiter = asyncio.ensure_future(scheduler.acquire("t1", "h"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.stats()["queued"] == 0
+        scheduler._release("t1", "h")
+        assert scheduler.stats()["inflight"] == 0
+    
+    asyncio.run(scenario())
+
+def test_scheduler_serves_tenants_round_robin():
+    async def scenario():
+        scheduler = OdooCallScheduler(tenant_concurrency=10, host_concurrency=1, tenant_queue=10, max_wait=5)
+        await scheduler.acquire("noisy", "h")
+        order = []
+        
+        async def call(tenant):
+            await scheduler.acquire(tenant, "h")
+            order.append(tenant)
+            scheduler._release(tenant, "h")
+        
+        tasks = [asyncio.ensure_future(call(tenant)) for tenant in ("noisy", "noisy", "quiet")]
+        await asyncio.sleep(0)
+        scheduler._release("noisy", "h")
+        await asyncio.gather(*tasks)
+        assert order == ["noisy", "quiet", "noisy"]
+    
+    asyncio.run(scenario())
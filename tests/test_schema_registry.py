@@ -0,0 +1,78 @@
+"""
+Tests du registre des schémas de modèles (fields_get) et de la sélection de champs par défaut
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.schema_registry import ModelSchemaRegistry, FIELD_ATTRIBUTES
+
+PARTNER_FIELDS = {
+    "id": {"type": "integer", "store": True},
+    "name": {"type": "char", "store": True},
+    "display_name": {"type": "char", "store": False},
+    "image_1920": {"type": "binary", "store": True},
+    "comment": {"type": "html", "store": True},
+    "child_ids": {"type": "one2many", "store": True},
+    "parent_id": {"type": "many2one", "store": True},
+    "total_due": {"type": "monetary", "store": False},
+}
+
+class FakeClient:
+    tenant_key = "tenant"
+    
+    def __init__(self, fields=PARTNER_FIELDS):
+        self.fields = fields
+        self.calls = []
+    
+    async def execute_method(self, model, method, args=None, kwargs=None):
+        self.calls.append((model, method, kwargs))
+        if self.fields is None:
+            return {"error": "Erreur Odoo"}
+        return {"result": self.fields}
+
+def test_default_fields_skip_heavy_types_and_non_stored_fields():
+    client = FakeClient()
+    fields = asyncio.run(ModelSchemaRegistry().default_fields(client, "res.partner"))
+    assert fields == ["id", "name", "display_name", "parent_id"]
+    assert client.calls == [("res.partner", "fields_get", {"attributes": FIELD_ATTRIBUTES})]
+
+def test_schema_is_cached_per_tenant_and_model():
+    registry = ModelSchemaRegistry()
+    client = FakeClient()
+    
+    async def scenario():
+        await registry.get_fields(client, "res.partner")
+        await registry.get_fields(client, "res.partner")
+        await registry.get_fields(client, "res.country")
+        registry.invalidate("tenant", "res.partner")
+        await registry.get_fields(client, "res.partner")
+    
+    asyncio.run(scenario())
+    assert [model for model, _, _ in client.calls] == ["res.partner", "res.country", "res.partner"]
+
+def test_schema_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.schema_registry.time.monotonic", lambda: now[0])
+    registry = ModelSchemaRegistry(ttl=60)
+    client = FakeClient()
+    asyncio.run(registry.get_fields(client, "res.partner"))
+    now[0] = 161.0
+    asyncio.run(registry.get_fields(client, "res.partner"))
+    assert len(client.calls) == 2
+
+def test_resolve_fields_validates_locally():
+    registry = ModelSchemaRegistry()
+    client = FakeClient()
+    assert asyncio.run(registry.resolve_fields(client, "res.partner", ["name", "child_ids"])) == ["name", "child_ids"]
+    with pytest.raises(ValueError, match="Champs inconnus sur res.partner: nmae"):
+        asyncio.run(registry.resolve_fields(client, "res.partner", ["nmae"]))
+    assert len(client.calls) == 1
+
+def test_unavailable_schema_is_not_cached_and_skips_validation():
+    registry = ModelSchemaRegistry()
+    client = FakeClient(fields=None)
+    assert asyncio.run(registry.resolve_fields(client, "x.model", ["anything"])) == ["anything"]
+    assert asyncio.run(registry.default_fields(client, "x.model")) is None
+    assert len(client.calls) == 2
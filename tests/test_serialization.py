@@ -0,0 +1,52 @@
+"""
+Tests de la sérialisation des résultats d'outils (compacte, table, orjson facultatif)
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core import serialization
+from app.core.serialization import dumps, dumps_bytes, to_table, resolve_format, format_tool_result
+
+@pytest.fixture(params=["orjson", "stdlib"], autouse=True)
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson non installé")
+    return request.param
+
+def test_dumps_is_compact_and_keeps_unicode():
+    assert dumps({"name": "Société", "ids": [1, 2]}) == '{"name":"Société","ids":[1,2]}'
+    assert dumps_bytes({"name": "É"}) == '{"name":"É"}'.encode("utf-8")
+
+def test_dumps_pretty_round_trips():
+    value = {"a": [1, {"b": None}]}
+    text = dumps(value, pretty=True)
+    assert "\n" in text and json.loads(text) == value
+
+def test_dumps_falls_back_to_str_for_unknown_types():
+    assert json.loads(dumps({"d": date(2026, 1, 2), "amount": Decimal("1.50")})) == {"d": "2026-01-02", "amount": "1.50"}
+
+def test_dumps_handles_non_string_keys_and_big_integers():
+    assert json.loads(dumps({1: "x"})) == {"1": "x"}
+    assert json.loads(dumps({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+def test_to_table_writes_each_column_once():
+    table = to_table([{"id": 1, "name": "a"}, {"id": 2, "email": "b@x"}])
+    assert table == {"columns": ["id", "name", "email"], "rows": [[1, "a", None], [2, None, "b@x"]]}
+
+def test_resolve_format():
+    assert resolve_format(None) == serialization.TOOL_RESULT_FORMAT
+    assert resolve_format("table") == "table"
+    with pytest.raises(ValueError, match="Format inconnu"):
+        resolve_format("xml")
+
+def test_format_tool_result_tables_only_record_lists():
+    records = {"result": [{"id": 1, "name": "a"}]}
+    assert json.loads(format_tool_result(records, "search_read", "table")) == {"result": {"columns": ["id", "name"], "rows": [[1, "a"]]}}
+    assert json.loads(format_tool_result({"result": [1, 2]}, "search", "table")) == {"result": [1, 2]}
+    assert json.loads(format_tool_result(records, "search_read", "json")) == records
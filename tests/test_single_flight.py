@@ -0,0 +1,112 @@
+"""
+Tests du regroupement des lectures identiques en cours (single-flight)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.odoo_client import OdooClient
+from app.core.result_cache import result_cache
+from app.core.single_flight import SingleFlight
+
+def test_single_flight_shares_one_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+        
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"result": [1]}
+        
+        results = await asyncio.gather(*(flight.do("key", call) for _ in range(5)))
+        assert results == [{"result": [1]}] * 5
+        assert len(calls) == 1
+        assert flight.shared == 4
+        assert len(flight) == 0
+        
+        # Terminé : un nouvel appel repart
+        await flight.do("key", call)
+        assert len(calls) == 2
+    
+    asyncio.run(scenario())
+
+def test_single_flight_distinct_keys_do_not_share():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def call(value):
+            await asyncio.sleep(0.01)
+            return value
+        
+        assert await asyncio.gather(flight.do("a", lambda: call(1)), flight.do("b", lambda: call(2))) == [1, 2]
+        assert flight.shared == 0
+    
+    asyncio.run(scenario())
+
+def test_single_flight_cancelled_caller_keeps_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        
+        async def call():
+            await release.wait()
+            return "done"
+        
+        first = asyncio.ensure_future(flight.do("key", call))
+        second = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        
+        release.set()
+        assert await second == "done"
+        assert len(flight) == 0
+    
+    asyncio.run(scenario())
+
+def test_single_flight_propagates_errors_to_all_callers():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("odoo down")
+        
+        results = await asyncio.gather(*(flight.do("key", call) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(flight) == 0
+    
+    asyncio.run(scenario())
+
+# Lectures via OdooClient
+
+def test_concurrent_reads_share_one_rpc_but_not_across_a_write(monkeypatch):
+    result_cache.clear()
+    client = OdooClient("https://flight-test.odoo.com", "db", "user", "secret")
+    calls = []
+    
+    async def execute_kw(model, method, args=None, kwargs=None):
+        calls.append(method)
+        await asyncio.sleep(0.05)
+        return {"result": [{"name": f"{method} {len(calls)}"}]}
+    
+    client._execute_kw = execute_kw
+    
+    async def scenario():
+        read = lambda: client.execute_method("res.partner", "search_read", [[]], {"fields": ["name"]})
+        first = asyncio.ensure_future(read())
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(read())
+        await asyncio.sleep(0)
+        await client.execute_method("res.partner", "write", [[1], {"name": "x"}])
+        # Partie après l'écriture : ne rejoint pas la lecture en cours
+        third = await read()
+        return await first, await second, third
+    
+    first, second, third = asyncio.run(scenario())
+    assert first == second
+    assert third != first
+    assert calls == ["search_read", "write", "search_read"]
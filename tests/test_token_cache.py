@@ -0,0 +1,81 @@
+"""
+Tests du cache token API -> tenant et de son invalidation par l'ORM
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.models import Base, User, APIToken
+from app.core.token_cache import TokenCache, ResolvedTenant, token_cache
+
+def test_get_set_and_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.token_cache.time.monotonic", lambda: now[0])
+    cache = TokenCache(ttl=60)
+    cache.set("tok", ResolvedTenant("tok", "u1"))
+    assert cache.get("tok").user_id == "u1"
+    now[0] = 161.0
+    assert cache.get("tok") is None
+    assert len(cache) == 0
+
+def test_size_is_bounded_least_recently_used_first():
+    cache = TokenCache(max_size=2)
+    for token in ("a", "b"):
+        cache.set(token, ResolvedTenant(token, "u1"))
+    cache.get("a")
+    cache.set("c", ResolvedTenant("c", "u1"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_invalidate_token_and_user():
+    cache = TokenCache()
+    cache.set("a", ResolvedTenant("a", "u1"))
+    cache.set("b", ResolvedTenant("b", "u1"))
+    cache.set("c", ResolvedTenant("c", "u2"))
+    cache.invalidate_token("a")
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.invalidate_user("u1")
+    assert cache.get("b") is None and cache.get("c") is not None
+
+# Invalidation par les écritures ORM (cache global)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(user_id="u1", odoo_url="https://x.odoo.com", odoo_db="x", odoo_username="a", odoo_password="p"))
+    session.add(APIToken(token="tok1", user_id="u1"))
+    session.commit()
+    token_cache.clear()
+    token_cache.set("tok1", ResolvedTenant("tok1", "u1"))
+    yield session
+    token_cache.clear()
+    session.close()
+    engine.dispose()
+
+def test_usage_update_keeps_the_entry(db):
+    db.query(APIToken).one().usage_count = 5
+    db.commit()
+    assert token_cache.get("tok1") is not None
+
+def test_deactivating_a_token_invalidates_it(db):
+    db.query(APIToken).one().is_active = False
+    db.commit()
+    assert token_cache.get("tok1") is None
+
+def test_deleting_a_token_invalidates_it(db):
+    db.delete(db.query(APIToken).one())
+    db.commit()
+    assert token_cache.get("tok1") is None
+
+def test_changing_odoo_credentials_invalidates_the_users_tokens(db):
+    db.query(User).one().odoo_password = "new"
+    db.commit()
+    assert token_cache.get("tok1") is None
+
+def test_renaming_the_user_keeps_the_entry(db):
+    db.query(User).one().user_name = "Someone"
+    db.commit()
+    assert token_cache.get("tok1") is not None
@@ -0,0 +1,84 @@
+"""
+Tests du traçage : spans, en-tête traceparent et export des traces
+"""
+
+import json
+import time
+import threading
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import FileExporter, Trace
+
+def _trace(sampled: bool = True, duration: float = 0.0) -> Trace:
+    trace = Trace("ab" * 16, None, sampled)
+    token = tracing.current_trace.set(trace)
+    try:
+        with tracing.span("http.request", path="/mcp"):
+            with tracing.span("odoo.call", model="res.partner"):
+                pass
+    finally:
+        tracing.current_trace.reset(token)
+    trace.root.duration = duration
+    return trace
+
+def test_spans_nest_under_the_root():
+    trace = _trace()
+    child, root = trace.spans
+    assert root.name == "http.request" and child.parent_id == root.span_id
+    assert trace.traceparent() == f"00-{'ab' * 16}-{root.span_id}-01"
+
+@pytest.mark.parametrize("header, expected", [
+    (f"00-{'a' * 32}-{'b' * 16}-01", ("a" * 32, "b" * 16, True)),
+    (f"00-{'a' * 32}-{'b' * 16}-00", ("a" * 32, "b" * 16, False)),
+    (f"00-{'0' * 32}-{'b' * 16}-01", None),
+    ("garbage", None),
+    (None, None),
+])
+def test_parse_traceparent(header, expected):
+    assert tracing._parse_traceparent(header) == expected
+
+def test_exporter_writes_otlp_lines_off_the_caller_thread(tmp_path, monkeypatch):
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"))
+    writers = []
+    format_line = exporter._format
+    monkeypatch.setattr(exporter, "_format", lambda trace: writers.append(threading.current_thread()) or format_line(trace))
+    
+    for _ in range(3):
+        exporter.export(_trace())
+    assert exporter.flush()
+    
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert len(lines) == 3 and exporter.exported == 3
+    spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["odoo.call", "http.request"]
+    assert threading.current_thread() not in writers
+
+def test_export_never_waits_for_a_slow_disk(tmp_path, monkeypatch):
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"), max_queue=1)
+    release = threading.Event()
+    format_line = exporter._format
+    monkeypatch.setattr(exporter, "_format", lambda trace: release.wait(5) and format_line(trace))
+    
+    started = time.perf_counter()
+    exporter.export(_trace())
+    time.sleep(0.05)
+    # Le premier est en cours d'écriture, le deuxième en file, le troisième abandonné
+    exporter.export(_trace())
+    exporter.export(_trace())
+    assert time.perf_counter() - started < 1
+    assert exporter.dropped == 1
+    
+    release.set()
+    assert exporter.flush()
+    assert exporter.exported == 2
+
+def test_finish_trace_exports_sampled_or_slow_traces(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracing.exporter, "export", exported.append)
+    monkeypatch.setattr(tracing, "TRACING_SLOW_THRESHOLD", 2)
+    fast, sampled, slow = _trace(False, 0.1), _trace(True, 0.1), _trace(False, 3.0)
+    for trace in (fast, sampled, slow):
+        tracing.finish_trace(trace)
+    assert exported == [sampled, slow]
@@ -0,0 +1,126 @@
+"""
+Tests de la comptabilisation de l'usage par token (agrégation et écriture par lots)
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Query, sessionmaker
+
+from app.core import usage as usage_module
+from app.core.models import Base, User, APIToken, APITokenUsage
+from app.core.usage import UsageAggregator
+
+class _Clock(datetime):
+    """datetime dont ``now()`` renvoie l'instant fixé par le test"""
+    
+    current = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(usage_module, "SessionLocal", factory)
+    monkeypatch.setattr(usage_module, "datetime", _Clock)
+    
+    session = factory()
+    session.add(User(user_id="u1", odoo_url="https://x.odoo.com", odoo_db="x", odoo_username="a", odoo_password="p"))
+    session.add_all([APIToken(token="tok1", user_id="u1", usage_count=0), APIToken(token="tok2", user_id="u1")])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+def _at(hour: int, minute: int = 0, second: int = 0) -> datetime:
+    return datetime(2026, 1, 1, hour, minute, second, tzinfo=timezone.utc)
+
+def _rows(db):
+    db.expire_all()
+    rows = db.query(APITokenUsage).order_by(APITokenUsage.api_token_id, APITokenUsage.period_start).all()
+    return [(row.api_token_id, row.period_start.hour, row.requests, row.odoo_calls, row.bytes_out, row.max_latency_ms) for row in rows]
+
+def test_flush_writes_counters_per_token(db):
+    aggregator = UsageAggregator()
+    _Clock.current = _at(10, 15)
+    aggregator.record("tok1", odoo_calls=2, bytes_out=100, latency_ms=12.0)
+    aggregator.record("tok1", odoo_calls=1, bytes_out=50, latency_ms=30.0)
+    aggregator.record("tok2", odoo_calls=0, bytes_out=10, latency_ms=1.0)
+    aggregator.record("unknown", odoo_calls=5)
+    asyncio.run(aggregator.flush())
+    
+    assert _rows(db) == [(1, 10, 2, 3, 150, 30.0), (2, 10, 1, 0, 10, 1.0)]
+    token = db.query(APIToken).filter(APIToken.token == "tok1").one()
+    assert token.usage_count == 2
+    assert token.last_used is not None
+
+def test_successive_flushes_add_up(db):
+    aggregator = UsageAggregator()
+    _Clock.current = _at(10, 15)
+    for latency in (5.0, 40.0, 20.0):
+        aggregator.record("tok1", odoo_calls=1, bytes_out=10, latency_ms=latency)
+        asyncio.run(aggregator.flush())
+    
+    assert _rows(db) == [(1, 10, 3, 3, 30, 40.0)]
+    assert db.query(APIToken).filter(APIToken.token == "tok1").one().usage_count == 3
+
+def test_usage_is_billed_to_the_hour_it_was_recorded(db):
+    aggregator = UsageAggregator()
+    _Clock.current = _at(10, 59, 59)
+    aggregator.record("tok1", odoo_calls=1)
+    _Clock.current = _at(11, 0, 1)
+    aggregator.record("tok1", odoo_calls=2)
+    asyncio.run(aggregator.flush())
+    
+    assert [(hour, requests, calls) for _, hour, requests, calls, _, _ in _rows(db)] == [(10, 1, 1), (11, 1, 2)]
+
+def test_workers_flushing_the_same_period_do_not_lose_usage(db, monkeypatch):
+    # Deux workers : chacun a son agrégateur et écrit dans la même ligne
+    first, second = UsageAggregator(), UsageAggregator()
+    _Clock.current = _at(10, 15)
+    first.record("tok1", odoo_calls=1)
+    second.record("tok1", odoo_calls=2)
+    asyncio.run(first.flush())
+    
+    # Le second worker n'a pas vu la ligne créée entre-temps par le premier :
+    # son INSERT échoue sur la contrainte unique, puis il incrémente la ligne
+    update = Query.update
+    missed = []
+    
+    def update_missing_first(query, values, **kwargs):
+        if not missed and query.column_descriptions[0]["entity"] is APITokenUsage:
+            missed.append(True)
+            return 0
+        return update(query, values, **kwargs)
+    
+    monkeypatch.setattr(Query, "update", update_missing_first)
+    asyncio.run(second.flush())
+    
+    assert missed
+    assert _rows(db) == [(1, 10, 2, 3, 0, 0.0)]
+    assert db.query(APIToken).filter(APIToken.token == "tok1").one().usage_count == 2
+
+def test_failed_flush_keeps_usage_for_the_next_one(db, monkeypatch):
+    aggregator = UsageAggregator()
+    _Clock.current = _at(10, 15)
+    aggregator.record("tok1", odoo_calls=1)
+    
+    factory = usage_module.SessionLocal
+    
+    def unavailable():
+        raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr(usage_module, "SessionLocal", unavailable)
+    asyncio.run(aggregator.flush())
+    assert _rows(db) == []
+    
+    aggregator.record("tok1", odoo_calls=2)
+    monkeypatch.setattr(usage_module, "SessionLocal", factory)
+    asyncio.run(aggregator.flush())
+    assert _rows(db) == [(1, 10, 2, 3, 0, 0.0)]